@@ -0,0 +1,168 @@
+"""
+Admission Control
+Bounded worker pool for agent requests. Slack handlers hand work off and
+return at once; a fixed number of workers run it, taking queued requests
+round-robin across channels and, within a channel, across users, so one
+busy user or channel cannot starve the rest.
+"""
+
+import time
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from config import MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS, MAX_QUEUED_PER_USER
+
+_Job = Tuple[Callable[..., Any], tuple]
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be queued; the message is user-facing."""
+
+
+class AdmissionController:
+    """
+    Global concurrency cap with per-channel and per-user fair queuing.
+
+    Usage:
+        admission = AdmissionController(max_concurrent=4, max_queued=20)
+        position = admission.submit(channel, user, process_message, event, say, client)
+        if position:
+            say(f"I'm busy right now - you're #{position} in line.")
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_queued: int = 20, max_queued_per_user: int = 2):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+
+        # channel -> user -> pending jobs; both levels rotate for round-robin.
+        self._queues: "OrderedDict[str, OrderedDict[str, Deque[_Job]]]" = OrderedDict()
+        self._queued = 0
+        self._active = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._workers = [
+            threading.Thread(target=self._run, daemon=True, name=f"agent-worker-{i}")
+            for i in range(max_concurrent)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, channel: str, user: str, fn: Callable[..., Any], *args) -> int:
+        """
+        Queue fn(*args) for a worker.
+
+        Returns:
+            0 if a worker is free to start it now, otherwise the request's
+            1-based position in line.
+        """
+        with self._cond:
+            if self._closed:
+                raise AdmissionRejected("I'm restarting right now. Please try again in a minute.")
+            if self._queued - self._idle_workers_locked() >= self.max_queued:
+                raise AdmissionRejected("I'm handling too many questions right now. Please try again in a few minutes.")
+
+            users = self._queues.setdefault(channel, OrderedDict())
+            jobs = users.setdefault(user, deque())
+            if len(jobs) >= self.max_queued_per_user:
+                raise AdmissionRejected(
+                    f"You already have {len(jobs)} questions waiting. I'll get to them before taking more."
+                )
+
+            jobs.append((fn, args))
+            self._queued += 1
+            position = self._position_locked(channel, user) - self._idle_workers_locked()
+            self._cond.notify()
+
+        return max(position, 0)
+
+    def stats(self) -> Dict[str, int]:
+        """Current load."""
+        with self._cond:
+            return {
+                'active': self._active,
+                'queued': self._queued,
+                'max_concurrent': self.max_concurrent,
+                'max_queued': self.max_queued
+            }
+
+    def close(self, timeout: float = None) -> bool:
+        """Stop accepting work, let queued and running requests finish within timeout in total; True if drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        # One deadline for all workers, so shutdown takes at most timeout overall.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(None if deadline is None else max(0, deadline - time.monotonic()))
+        return not any(worker.is_alive() for worker in self._workers)
+
+    def _idle_workers_locked(self) -> int:
+        return self.max_concurrent - self._active
+
+    def _position_locked(self, channel: str, user: str) -> int:
+        """Dispatch position of the newest job for (channel, user) under round-robin."""
+        remaining = {
+            ch: OrderedDict((u, len(jobs)) for u, jobs in users.items())
+            for ch, users in self._queues.items()
+        }
+        channels = deque(remaining)
+        position = 0
+        while channels:
+            ch = channels.popleft()
+            users = remaining[ch]
+            u, count = users.popitem(last=False)
+            position += 1
+            if ch == channel and u == user and count == 1:
+                return position
+            if count > 1:
+                users[u] = count - 1
+            if users:
+                channels.append(ch)
+        return position
+
+    def _next_job_locked(self) -> _Job:
+        """Pop the next job round-robin (caller holds the lock, queue non-empty)."""
+        channel, users = next(iter(self._queues.items()))
+        user, jobs = next(iter(users.items()))
+        job = jobs.popleft()
+        self._queued -= 1
+
+        # Rotate both levels so the next pick comes from someone else.
+        del users[user]
+        if jobs:
+            users[user] = jobs
+        del self._queues[channel]
+        if users:
+            self._queues[channel] = users
+        return job
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queued and not self._closed:
+                    self._cond.wait()
+                if not self._queued:
+                    return
+                fn, args = self._next_job_locked()
+                self._active += 1
+
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Request failed: {e}")
+            finally:
+                with self._cond:
+                    self._active -= 1
+
+
+def create_admission_controller() -> AdmissionController:
+    """Create the shared admission controller from configuration."""
+    return AdmissionController(
+        max_concurrent=MAX_CONCURRENT_REQUESTS,
+        max_queued=MAX_QUEUED_REQUESTS,
+        max_queued_per_user=MAX_QUEUED_PER_USER
+    )
@@ -0,0 +1,155 @@
+"""
+Answer Cache
+Opt-in cache of complete agent answers for repeated first-turn questions.
+Questions are matched after normalizing case, whitespace, punctuation and
+Slack mentions; follow-ups with thread history are never served from cache.
+
+Like the SQL result cache, DataFrames are never shared with callers: put()
+stores copies and get() returns fresh ones.
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, Optional, Tuple
+
+from config import ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_MAX_BYTES
+from cortex_agent import AgentResponse
+
+
+def normalize_question(question: str) -> str:
+    """Canonical form of a question for cache lookups."""
+    question = re.sub(r'<@\w+>', ' ', question)
+    question = re.sub(r'[^\w\s]', ' ', question.lower())
+    return ' '.join(question.split())
+
+
+def _response_size(response: AgentResponse) -> int:
+    """Approximate memory footprint of a cached response in bytes."""
+    size = len(response.text) + sum(len(sql) for sql in response.sql_queries)
+    # data is one of the datasets, so it is not counted separately.
+    frames = response.datasets or [response.data]
+    for data in frames:
+        if data is not None:
+            size += int(data.memory_usage(index=True, deep=True).sum())
+    return size
+
+
+def _copy_response(response: AgentResponse) -> AgentResponse:
+    """Copy of a response with its own lists and DataFrames."""
+    datasets = [df.copy() for df in response.datasets]
+    if datasets:
+        data = next((df for df in datasets if df is not None), None)
+    else:
+        data = response.data.copy() if response.data is not None else None
+
+    return replace(
+        response,
+        data=data,
+        datasets=datasets,
+        sql_queries=list(response.sql_queries),
+        suggestions=list(response.suggestions),
+        planning_steps=list(response.planning_steps),
+        thinking_content=list(response.thinking_content)
+    )
+
+
+class AnswerCache:
+    """
+    TTL + LRU cache of AgentResponse objects keyed by normalized question.
+
+    Usage:
+        cache = AnswerCache(ttl_seconds=600)
+        agent = CortexAgent(agent_url, pat, answer_cache=cache)
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 600,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, Tuple[AgentResponse, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, question: str) -> Optional[AgentResponse]:
+        """Return a copy of the cached answer, or None on a miss or expiry."""
+        key = normalize_question(question)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, stored_at, _ = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy_response(response)
+                self._remove_locked(key)
+
+            self.misses += 1
+            return None
+
+    def put(self, question: str, response: AgentResponse):
+        """Cache a successful answer (not one where any query failed)."""
+        if response.error or not response.text:
+            return
+        if any(df is None for df in response.datasets):
+            return
+
+        key = normalize_question(question)
+        if not key:
+            return
+
+        size = _response_size(response)
+        if size > self.max_bytes:
+            return
+        response = _copy_response(response)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+
+            self._entries[key] = (response, time.time(), size)
+            self._bytes += size
+
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                self._remove_locked(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def _remove_locked(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+def create_answer_cache() -> Optional[AnswerCache]:
+    """Create the shared answer cache from configuration (None unless enabled)."""
+    if ANSWER_CACHE_TTL <= 0:
+        return None
+
+    return AnswerCache(
+        ttl_seconds=ANSWER_CACHE_TTL,
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        max_bytes=ANSWER_CACHE_MAX_BYTES
+    )
@@ -5,242 +5,175 @@ Reference implementation for integrating Snowflake Cortex Agents with Slack.
 
 import os
 import re
+import sys
 import json
-import tempfile
-import time
-from typing import Optional, Dict, List
-from collections import defaultdict
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
-import snowflake.connector
-from dotenv import load_dotenv
 
-from cortex_agent import CortexAgent
+from config import (
+    SLACK_APP_TOKEN, SLACK_BOT_TOKEN, AGENT_ENDPOINT, PAT,
+    AGENT_POOL_SIZE, AGENT_CONNECT_TIMEOUT, AGENT_READ_TIMEOUT,
+    MAX_RESULT_ROWS, MAX_RESULT_BYTES, MAX_PARALLEL_QUERIES, SNOWFLAKE_POOL_SIZE, SLACK_CONCURRENCY,
+    STATUS_UPDATE_INTERVAL, STREAM_RESPONSES, STREAM_UPDATE_INTERVAL, DRAIN_TIMEOUT,
+    CHART_WORKERS, CHART_THREADS, CHART_IN_MEMORY, CHART_TOP_N, CHART_MAX_POINTS,
+    CHART_DPI, CHART_PNG_PALETTE
+)
+from admission import AdmissionController, AdmissionRejected, create_admission_controller
+from conversation import get_conversation_key, get_conversation_history, add_to_conversation
+from snowflake_conn import create_snowflake_pool
+from result_cache import create_result_cache
+from answer_cache import create_answer_cache
+from slack_blocks import (
+    WELCOME_BLOCKS, PROCESSING_BLOCKS, create_thinking_block,
+    create_thinking_details_blocks, create_response_blocks, create_chart_image_blocks
+)
+from slack_updates import MessageUpdater, ResponseStreamer
+from cortex_agent import CortexAgent, AgentCallbacks
 from charts import ChartGenerator
-
-load_dotenv()
-
-ACCOUNT = os.getenv("ACCOUNT")
-USER = os.getenv("DEMO_USER")
-ROLE = os.getenv("DEMO_USER_ROLE", "cortex_agent_slack_role")
-WAREHOUSE = os.getenv("WAREHOUSE", "SFE_CORTEX_AGENT_SLACK_WH")
-SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
-SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
-AGENT_ENDPOINT = os.getenv("AGENT_ENDPOINT")
-PAT = os.getenv("PAT")
-
-app = App(token=SLACK_BOT_TOKEN)
-chart_gen = ChartGenerator()
+from chart_pool import ChartRenderPool, create_chart_pool, create_chart_cache
+
+# Replacement chart workers import this script as __mp_main__; only the real
+# entry point checks the token with Slack (an auth.test call).
+app = App(token=SLACK_BOT_TOKEN, token_verification_enabled=__name__ == "__main__")
+CHART_CACHE = create_chart_cache()
+chart_gen = ChartGenerator(
+    in_memory=CHART_IN_MEMORY,
+    cache=CHART_CACHE,
+    top_n=CHART_TOP_N,
+    max_points=CHART_MAX_POINTS,
+    dpi=CHART_DPI,
+    palette=CHART_PNG_PALETTE
+)
 
 CORTEX_AGENT: Optional[CortexAgent] = None
-SNOWFLAKE_CONN = None
-
-# Conversation history storage: {conversation_key: [{"role": "user"|"assistant", "content": "..."}]}
-CONVERSATION_HISTORY: Dict[str, List[Dict[str, str]]] = defaultdict(list)
-CONVERSATION_TIMESTAMPS: Dict[str, float] = {}
-MAX_HISTORY_LENGTH = 10  # Keep last N message pairs
-HISTORY_TTL_SECONDS = 3600  # Clear history after 1 hour of inactivity
-
-
-def get_conversation_key(event: dict) -> str:
-    """Get unique conversation key from Slack event (thread_ts or channel)."""
-    thread_ts = event.get('thread_ts')
-    channel = event.get('channel', '')
+SNOWFLAKE_POOL = None
+ADMISSION: Optional[AdmissionController] = None
+CHART_POOL: Optional[ChartRenderPool] = None
 
-    # If in a thread, use thread_ts as key
-    if thread_ts:
-        return f"{channel}:{thread_ts}"
-    # For DMs without threads, use channel (each DM channel is unique per user)
-    return channel
+# Charts render in CHART_POOL's worker processes; these threads only wait for
+# them and upload, so answers never wait on a chart. Without worker processes
+# the threads render in-process, which is thread-safe.
+CHART_UPLOADS = ThreadPoolExecutor(
+    max_workers=CHART_WORKERS * 2 if CHART_WORKERS > 0 else CHART_THREADS,
+    thread_name_prefix="chart-upload"
+)
 
 
-def get_conversation_history(key: str) -> List[Dict[str, str]]:
-    """Get conversation history, clearing if expired."""
-    # Check if conversation has expired
-    last_time = CONVERSATION_TIMESTAMPS.get(key, 0)
-    if time.time() - last_time > HISTORY_TTL_SECONDS:
-        CONVERSATION_HISTORY[key] = []
-
-    return CONVERSATION_HISTORY[key]
+def post_chart(client, channel: str, data, question: str, sql_queries: list):
+    """Render a chart for the query result and upload it to Slack."""
+    try:
+        if CHART_POOL:
+            chart_info = CHART_POOL.render(data, question, sql_queries)
+        else:
+            chart_info = chart_gen.analyze_and_generate(data, question, sql_queries)
+
+        if not chart_info or not (chart_info.get('image') or chart_info.get('path')):
+            return
+
+        title = chart_info.get('title', 'Data Visualization')
+        key = chart_info.get('key')
+
+        # A chart already uploaded to this channel is re-posted by file ID.
+        file_id = CHART_CACHE.uploaded_file(key, channel) if CHART_CACHE and key else None
+        if file_id and post_uploaded_chart(client, channel, file_id, title):
+            return
+        if file_id:
+            CHART_CACHE.forget_upload(key, channel)
+
+        try:
+            file_id = upload_chart_to_slack(
+                client,
+                channel,
+                chart_info.get('image') or chart_info['path'],
+                title
+            )
+        finally:
+            if chart_info.get('path') and os.path.exists(chart_info['path']):
+                os.remove(chart_info['path'])
 
+        if file_id and CHART_CACHE and key:
+            CHART_CACHE.remember_upload(key, channel, file_id)
 
-def add_to_conversation(key: str, role: str, content: str):
-    """Add a message to conversation history."""
-    CONVERSATION_HISTORY[key].append({"role": role, "content": content})
-    CONVERSATION_TIMESTAMPS[key] = time.time()
+    except Exception as e:
+        print(f"Chart generation failed: {e}")
 
-    # Trim to max length (keep pairs: user + assistant)
-    if len(CONVERSATION_HISTORY[key]) > MAX_HISTORY_LENGTH * 2:
-        CONVERSATION_HISTORY[key] = CONVERSATION_HISTORY[key][-(MAX_HISTORY_LENGTH * 2):]
 
+def upload_chart_to_slack(client, channel: str, chart: Union[str, bytes], title: str) -> Optional[str]:
+    """
+    Upload a chart image to Slack from PNG bytes or a file path.
 
-def get_snowflake_connection():
-    """Create Snowflake connection using PAT authentication."""
+    Returns:
+        The Slack file ID, or None if the upload failed
+    """
     try:
-        if not ACCOUNT:
-            print("No account identifier found - set ACCOUNT env var")
-            return None
-
-        conn = snowflake.connector.connect(
-            user=USER,
-            password=PAT,
-            account=ACCOUNT,
-            warehouse=WAREHOUSE,
-            role=ROLE
+        # files_upload_v2 reads a str as a file path and uploads bytes as-is.
+        response = client.files_upload_v2(
+            channel=channel,
+            file=chart,
+            filename=f"{title.replace(' ', '_')}.png",
+            title=title
         )
-
-        cursor = conn.cursor()
-        cursor.execute("SELECT CURRENT_VERSION()")
-        row = cursor.fetchone()
-        version = row[0] if row else "unknown"
-        cursor.close()
-
-        print(f"Connected to Snowflake v{version}")
-        return conn
-
+        return (response.get('file') or {}).get('id')
     except Exception as e:
-        print(f"Snowflake connection failed: {e}")
+        print(f"Chart upload failed: {e}")
         return None
 
 
-def upload_chart_to_slack(client, channel: str, chart_path: str, title: str) -> bool:
-    """Upload a chart image to Slack."""
+def post_uploaded_chart(client, channel: str, file_id: str, title: str) -> bool:
+    """Post a previously uploaded chart image without uploading it again."""
     try:
-        with open(chart_path, 'rb') as f:
-            client.files_upload_v2(
-                channel=channel,
-                file=f,
-                filename=f"{title.replace(' ', '_')}.png",
-                title=title
-            )
+        client.chat_postMessage(
+            channel=channel,
+            text=title,
+            blocks=create_chart_image_blocks(file_id, title)
+        )
         return True
     except Exception as e:
-        print(f"Chart upload failed: {e}")
+        print(f"Chart re-post failed: {e}")
         return False
 
 
-def format_for_slack(text: str) -> str:
-    """Convert markdown to Slack mrkdwn format."""
-    if not text:
-        return text
-    text = re.sub(r'\*\*(.*?)\*\*', r'*\1*', text)
-    text = re.sub(r'__(.*?)__', r'*\1*', text)
-    return text
-
-
-def create_thinking_block(status: str, steps: list = None, is_complete: bool = False) -> list:
-    """Create Slack blocks for thinking/reasoning display."""
-    if is_complete:
-        step_count = len(steps) if steps else 0
-        header = f"*Thinking...* Complete ({step_count} steps)"
-    else:
-        header = f"*Thinking...* {status}"
-
-    blocks = [
-        {
-            "type": "section",
-            "text": {"type": "mrkdwn", "text": header}
-        }
-    ]
-
-    if is_complete and steps:
-        blocks.append({
-            "type": "actions",
-            "elements": [{
-                "type": "button",
-                "text": {"type": "plain_text", "text": "Show Details"},
-                "action_id": "show_thinking_details",
-                "value": json.dumps({"steps": steps[-20:]})
-            }]
-        })
-
-    return blocks
-
-
-def create_response_blocks(response: dict) -> list:
-    """Create Slack blocks for the agent response."""
-    blocks = []
-
-    if response.get('text'):
-        formatted_text = format_for_slack(response['text'])
-
-        if len(formatted_text) > 2900:
-            formatted_text = formatted_text[:2900] + "..."
-
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Response:*\n{formatted_text}"
-            }
-        })
-
-    if response.get('verified_query_used'):
-        blocks.append({
-            "type": "context",
-            "elements": [{
-                "type": "mrkdwn",
-                "text": "*Verified Query* - Answer accuracy verified by agent owner"
-            }]
-        })
-
-    if response.get('citations'):
-        citations_text = format_for_slack(response['citations'])
-        if len(citations_text) > 500:
-            citations_text = citations_text[:500] + "..."
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Sources:*\n_{citations_text}_"
-            }
-        })
-
-    if response.get('suggestions'):
-        suggestions = response['suggestions'][:3]
-        suggestions_text = "\n".join(f"- {s}" for s in suggestions)
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Try asking:*\n{suggestions_text}"
-            }
-        })
-
-    return blocks
-
-
 @app.message("hello")
 def handle_hello(message, say):
     """Handle hello message with welcome info."""
-    say(
-        blocks=[
-            {
-                "type": "header",
-                "text": {"type": "plain_text", "text": "Snowflake Cortex Agent"}
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "I can help you analyze support tickets and search company documents.\n\n*Try asking:*\n- _How many tickets by service type?_\n- _What are the payment terms for Snowtires?_\n- _Show contact preference breakdown_"
-                }
-            }
-        ]
-    )
+    say(blocks=WELCOME_BLOCKS)
 
 
 @app.event("app_mention")
 def handle_mention(event, say, client):
     """Handle @mentions of the bot."""
-    process_message(event, say, client)
+    admit_message(event, say, client)
 
 
 @app.message(re.compile(".*"))
 def handle_dm(message, say, client):
     """Handle direct messages."""
     if message.get('channel_type') == 'im':
-        process_message(message, say, client)
+        admit_message(message, say, client)
+
+
+def admit_message(event: dict, say, client):
+    """Queue a message for an agent worker so the Bolt listener returns at once."""
+    if not ADMISSION:
+        process_message(event, say, client)
+        return
+
+    try:
+        position = ADMISSION.submit(
+            event.get('channel', ''),
+            event.get('user', ''),
+            process_message,
+            event, say, client
+        )
+    except AdmissionRejected as e:
+        say(str(e))
+        return
+
+    if position:
+        say(f"I'm busy right now - you're #{position} in line.")
 
 
 def process_message(event: dict, say, client):
@@ -264,19 +197,7 @@ def process_message(event: dict, say, client):
     conversation_key = get_conversation_key(event)
     history = get_conversation_history(conversation_key)
 
-    initial_msg = say(
-        text="Processing...",
-        blocks=[
-            {"type": "divider"},
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "*Snowflake Cortex Agent* is processing your request..."
-                }
-            }
-        ]
-    )
+    initial_msg = say(text="Processing...", blocks=PROCESSING_BLOCKS)
 
     thinking_msg = say(
         text="Thinking...",
@@ -284,73 +205,68 @@ def process_message(event: dict, say, client):
     )
     thinking_ts = thinking_msg.get('ts') if thinking_msg else None
 
+    # Status edits go through a coalescing background sender so Slack API
+    # latency and rate limits never stall the agent stream.
+    thinking_updater = None
+    if thinking_ts and channel:
+        thinking_updater = MessageUpdater(client, channel, thinking_ts, min_interval=STATUS_UPDATE_INTERVAL)
+
     def on_status_update(status: str, steps: list):
         """Callback for real-time status updates."""
-        if thinking_ts and channel:
-            try:
-                client.chat_update(
-                    channel=channel,
-                    ts=thinking_ts,
-                    text=f"Thinking... {status}",
-                    blocks=create_thinking_block(status, steps)
-                )
-            except Exception as e:
-                print(f"Status update failed: {e}")
+        if thinking_updater:
+            thinking_updater.update(
+                text=f"Thinking... {status}",
+                blocks=create_thinking_block(status, list(steps))
+            )
+
+    # In streaming mode the answer grows in place as text deltas arrive.
+    streamer = None
+    if STREAM_RESPONSES and channel:
+        streamer = ResponseStreamer(client, channel, min_interval=STREAM_UPDATE_INTERVAL)
 
     try:
         response = CORTEX_AGENT.chat(
             user_message,
             on_status=on_status_update,
-            conversation_history=history if history else None
+            conversation_history=history if history else None,
+            callbacks=AgentCallbacks(on_text_delta=streamer.append) if streamer else None
         )
 
-        if thinking_ts and channel:
-            try:
-                steps = getattr(CORTEX_AGENT, 'planning_steps', [])
-                client.chat_update(
-                    channel=channel,
-                    ts=thinking_ts,
-                    text="Thinking complete",
-                    blocks=create_thinking_block("", steps, is_complete=True)
-                )
-            except Exception:
-                pass
+        if thinking_updater:
+            steps = response.get('planning_steps', [])
+            thinking_updater.finish(
+                text="Thinking complete",
+                blocks=create_thinking_block("", steps, is_complete=True)
+            )
 
         # Store conversation history for context
         add_to_conversation(conversation_key, "user", user_message)
         if response.get('text'):
             add_to_conversation(conversation_key, "assistant", response['text'])
 
-        response_blocks = create_response_blocks(response)
-        if response_blocks:
-            say(text="Response", blocks=response_blocks)
-
-        if response.get('sql_queries') and response.get('data') is not None:
-            try:
-                chart_info = chart_gen.analyze_and_generate(
-                    response['data'],
-                    user_message,
-                    response.get('sql_queries', [])
-                )
+        if streamer:
+            streamer.finish(response)
+        else:
+            response_blocks = create_response_blocks(response)
+            if response_blocks:
+                say(text="Response", blocks=response_blocks)
 
-                if chart_info and chart_info.get('path'):
-                    upload_chart_to_slack(
-                        client,
-                        channel,
-                        chart_info['path'],
-                        chart_info.get('title', 'Data Visualization')
-                    )
-
-                    if os.path.exists(chart_info['path']):
-                        os.remove(chart_info['path'])
-
-            except Exception as e:
-                print(f"Chart generation failed: {e}")
+        # The text answer is already posted; one chart per query result
+        # follows, each rendered and uploaded concurrently.
+        for sql, data in zip(response.get('sql_queries', []), response.get('datasets', [])):
+            if data is not None:
+                CHART_UPLOADS.submit(post_chart, client, channel, data, user_message, [sql])
 
     except Exception as e:
         print(f"Error: {e}")
         say(f"Sorry, an error occurred: {str(e)}")
 
+    finally:
+        if thinking_updater:
+            thinking_updater.finish()
+        if streamer:
+            streamer.finish()
+
 
 @app.action("show_thinking_details")
 def handle_thinking_details(ack, body, client):
@@ -363,28 +279,7 @@ def handle_thinking_details(ack, body, client):
         channel = body["channel"]["id"]
         ts = body["message"]["ts"]
 
-        steps_text = "\n".join(f"- {step}" for step in steps)
-        if len(steps_text) > 2800:
-            steps_text = steps_text[:2800] + "\n_...truncated_"
-
-        blocks = [
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"*Thinking Steps:*\n{steps_text}"
-                }
-            },
-            {
-                "type": "actions",
-                "elements": [{
-                    "type": "button",
-                    "text": {"type": "plain_text", "text": "Hide Details"},
-                    "action_id": "hide_thinking_details",
-                    "value": json.dumps({"steps": steps})
-                }]
-            }
-        ]
+        blocks = create_thinking_details_blocks(steps)
 
         client.chat_update(channel=channel, ts=ts, text="Thinking steps", blocks=blocks)
 
@@ -416,27 +311,65 @@ def handle_hide_details(ack, body, client):
 
 def init():
     """Initialize connections."""
-    global CORTEX_AGENT, SNOWFLAKE_CONN
+    global CORTEX_AGENT, SNOWFLAKE_POOL, ADMISSION, CHART_POOL
 
     print("Initializing Cortex Agent + Slack...")
 
-    SNOWFLAKE_CONN = get_snowflake_connection()
+    # Fork chart workers before any other threads exist.
+    CHART_POOL = create_chart_pool(CHART_CACHE)
+
+    SNOWFLAKE_POOL = create_snowflake_pool()
 
     CORTEX_AGENT = CortexAgent(
         agent_url=AGENT_ENDPOINT,
         pat=PAT,
-        connection=SNOWFLAKE_CONN
+        sql_pool=SNOWFLAKE_POOL,
+        max_result_rows=MAX_RESULT_ROWS,
+        max_result_bytes=MAX_RESULT_BYTES,
+        result_cache=create_result_cache(),
+        answer_cache=create_answer_cache(),
+        sql_workers=SNOWFLAKE_POOL_SIZE,
+        pool_size=AGENT_POOL_SIZE,
+        connect_timeout=AGENT_CONNECT_TIMEOUT,
+        read_timeout=AGENT_READ_TIMEOUT,
+        aggregate_top_n=CHART_TOP_N,
+        max_parallel_queries=MAX_PARALLEL_QUERIES
     )
 
+    ADMISSION = create_admission_controller()
+
     print("Initialization complete")
-    return SNOWFLAKE_CONN, CORTEX_AGENT
+    return SNOWFLAKE_POOL, CORTEX_AGENT
+
+
+def shutdown(signum, frame):
+    """Turn SIGTERM/SIGINT into a clean exit; later signals are ignored while draining."""
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    raise SystemExit(0)
 
 
 if __name__ == "__main__":
-    SNOWFLAKE_CONN, CORTEX_AGENT = init()
+    SNOWFLAKE_POOL, CORTEX_AGENT = init()
+
+    if SNOWFLAKE_POOL:
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
 
-    if SNOWFLAKE_CONN:
         print("Starting Slack bot...")
-        SocketModeHandler(app, SLACK_APP_TOKEN).start()
+        handler = SocketModeHandler(app, SLACK_APP_TOKEN, concurrency=SLACK_CONCURRENCY)
+        try:
+            handler.start()
+        finally:
+            # Stop taking new events, then let queued and in-flight answers finish.
+            print("Draining in-flight requests...")
+            handler.close()
+            ADMISSION.close(timeout=DRAIN_TIMEOUT)
+            CHART_UPLOADS.shutdown(wait=True)
+            if CHART_POOL:
+                CHART_POOL.close()
+            CORTEX_AGENT.close()
+            SNOWFLAKE_POOL.close()
     else:
         print("Failed to connect. Check your configuration.")
+        sys.exit(1)
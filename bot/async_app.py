@@ -0,0 +1,346 @@
+"""
+Cortex Agent + Slack Integration (asyncio)
+Event-loop variant of app.py built on Bolt's AsyncApp and async Socket Mode
+handler. Each in-flight question is a coroutine instead of an OS thread.
+"""
+
+import os
+import re
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+from slack_bolt.async_app import AsyncApp
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+
+from config import (
+    SLACK_APP_TOKEN, SLACK_BOT_TOKEN, AGENT_ENDPOINT, PAT,
+    AGENT_POOL_SIZE, AGENT_CONNECT_TIMEOUT, AGENT_READ_TIMEOUT,
+    MAX_RESULT_ROWS, MAX_RESULT_BYTES, MAX_PARALLEL_QUERIES, STATUS_UPDATE_INTERVAL,
+    STREAM_RESPONSES, STREAM_UPDATE_INTERVAL, CHART_IN_MEMORY, CHART_THREADS,
+    CHART_TOP_N, CHART_MAX_POINTS, CHART_DPI, CHART_PNG_PALETTE
+)
+from conversation import get_conversation_key, get_conversation_history, add_to_conversation
+from snowflake_conn import create_snowflake_pool
+from result_cache import create_result_cache
+from answer_cache import create_answer_cache
+from slack_blocks import (
+    WELCOME_BLOCKS, PROCESSING_BLOCKS, create_thinking_block,
+    create_thinking_details_blocks, create_response_blocks, create_chart_image_blocks
+)
+from slack_updates import AsyncMessageUpdater, AsyncResponseStreamer
+from cortex_agent import AgentCallbacks
+from async_cortex_agent import AsyncCortexAgent
+from charts import ChartGenerator
+from chart_pool import ChartRenderPool, create_chart_pool, create_chart_cache
+
+app = AsyncApp(token=SLACK_BOT_TOKEN)
+CHART_CACHE = create_chart_cache()
+chart_gen = ChartGenerator(
+    in_memory=CHART_IN_MEMORY,
+    cache=CHART_CACHE,
+    top_n=CHART_TOP_N,
+    max_points=CHART_MAX_POINTS,
+    dpi=CHART_DPI,
+    palette=CHART_PNG_PALETTE
+)
+
+# Without chart worker processes, charts render on these threads so the
+# event loop stays free.
+CHART_EXECUTOR = ThreadPoolExecutor(max_workers=CHART_THREADS, thread_name_prefix="chart")
+
+CORTEX_AGENT: Optional[AsyncCortexAgent] = None
+SNOWFLAKE_POOL = None
+CHART_POOL: Optional[ChartRenderPool] = None
+
+# Chart uploads run after the answer is posted; references keep them alive.
+CHART_TASKS = set()
+
+
+async def post_chart(client, channel: str, data, question: str, sql_queries: list):
+    """Render a chart for the query result and upload it to Slack."""
+    try:
+        if CHART_POOL:
+            chart_info = await CHART_POOL.render_async(data, question, sql_queries)
+        else:
+            loop = asyncio.get_running_loop()
+            chart_info = await loop.run_in_executor(
+                CHART_EXECUTOR,
+                chart_gen.analyze_and_generate,
+                data,
+                question,
+                sql_queries
+            )
+
+        if not chart_info or not (chart_info.get('image') or chart_info.get('path')):
+            return
+
+        title = chart_info.get('title', 'Data Visualization')
+        key = chart_info.get('key')
+
+        # A chart already uploaded to this channel is re-posted by file ID.
+        file_id = CHART_CACHE.uploaded_file(key, channel) if CHART_CACHE and key else None
+        if file_id and await post_uploaded_chart(client, channel, file_id, title):
+            return
+        if file_id:
+            CHART_CACHE.forget_upload(key, channel)
+
+        try:
+            file_id = await upload_chart_to_slack(
+                client,
+                channel,
+                chart_info.get('image') or chart_info['path'],
+                title
+            )
+        finally:
+            if chart_info.get('path') and os.path.exists(chart_info['path']):
+                os.remove(chart_info['path'])
+
+        if file_id and CHART_CACHE and key:
+            CHART_CACHE.remember_upload(key, channel, file_id)
+
+    except Exception as e:
+        print(f"Chart generation failed: {e}")
+
+
+async def upload_chart_to_slack(client, channel: str, chart: Union[str, bytes], title: str) -> Optional[str]:
+    """
+    Upload a chart image to Slack from PNG bytes or a file path.
+
+    Returns:
+        The Slack file ID, or None if the upload failed
+    """
+    try:
+        # files_upload_v2 reads a str as a file path and uploads bytes as-is.
+        response = await client.files_upload_v2(
+            channel=channel,
+            file=chart,
+            filename=f"{title.replace(' ', '_')}.png",
+            title=title
+        )
+        return (response.get('file') or {}).get('id')
+    except Exception as e:
+        print(f"Chart upload failed: {e}")
+        return None
+
+
+async def post_uploaded_chart(client, channel: str, file_id: str, title: str) -> bool:
+    """Post a previously uploaded chart image without uploading it again."""
+    try:
+        await client.chat_postMessage(
+            channel=channel,
+            text=title,
+            blocks=create_chart_image_blocks(file_id, title)
+        )
+        return True
+    except Exception as e:
+        print(f"Chart re-post failed: {e}")
+        return False
+
+
+@app.message("hello")
+async def handle_hello(message, say):
+    """Handle hello message with welcome info."""
+    await say(blocks=WELCOME_BLOCKS)
+
+
+@app.event("app_mention")
+async def handle_mention(event, say, client):
+    """Handle @mentions of the bot."""
+    await process_message(event, say, client)
+
+
+@app.message(re.compile(".*"))
+async def handle_dm(message, say, client):
+    """Handle direct messages."""
+    if message.get('channel_type') == 'im':
+        await process_message(message, say, client)
+
+
+async def process_message(event: dict, say, client):
+    """Main message processing with streaming updates and conversation context."""
+    user_message = event.get('text', '').strip()
+    user_message = re.sub(r'<@\w+>', '', user_message).strip()
+
+    if not user_message:
+        await say("Hi! Ask me anything about support tickets or company documents.")
+        return
+
+    if not CORTEX_AGENT:
+        await say("Agent not initialized. Please check configuration.")
+        return
+
+    channel = event.get('channel')
+
+    # Get conversation context. The SQLite backend blocks on its file lock,
+    # so history reads and writes run off the event loop.
+    conversation_key = get_conversation_key(event)
+    history = await asyncio.to_thread(get_conversation_history, conversation_key)
+
+    await say(text="Processing...", blocks=PROCESSING_BLOCKS)
+
+    thinking_msg = await say(
+        text="Thinking...",
+        blocks=create_thinking_block("Starting...")
+    )
+    thinking_ts = thinking_msg.get('ts') if thinking_msg else None
+
+    # Status edits go through a coalescing background task so Slack API
+    # latency and rate limits never stall the agent stream.
+    thinking_updater = None
+    if thinking_ts and channel:
+        thinking_updater = AsyncMessageUpdater(client, channel, thinking_ts, min_interval=STATUS_UPDATE_INTERVAL)
+
+    def on_status_update(status: str, steps: list):
+        """Callback for real-time status updates."""
+        if thinking_updater:
+            thinking_updater.update(
+                text=f"Thinking... {status}",
+                blocks=create_thinking_block(status, list(steps))
+            )
+
+    # In streaming mode the answer grows in place as text deltas arrive.
+    streamer = None
+    if STREAM_RESPONSES and channel:
+        streamer = AsyncResponseStreamer(client, channel, min_interval=STREAM_UPDATE_INTERVAL)
+
+    try:
+        response = await CORTEX_AGENT.chat(
+            user_message,
+            on_status=on_status_update,
+            conversation_history=history if history else None,
+            callbacks=AgentCallbacks(on_text_delta=streamer.append) if streamer else None
+        )
+
+        if thinking_updater:
+            steps = response.get('planning_steps', [])
+            await thinking_updater.finish(
+                text="Thinking complete",
+                blocks=create_thinking_block("", steps, is_complete=True)
+            )
+
+        # Store conversation history for context
+        await asyncio.to_thread(add_to_conversation, conversation_key, "user", user_message)
+        if response.get('text'):
+            await asyncio.to_thread(add_to_conversation, conversation_key, "assistant", response['text'])
+
+        if streamer:
+            await streamer.finish(response)
+        else:
+            response_blocks = create_response_blocks(response)
+            if response_blocks:
+                await say(text="Response", blocks=response_blocks)
+
+        # The text answer is already posted; one chart per query result
+        # follows, each rendered and uploaded concurrently.
+        for sql, data in zip(response.get('sql_queries', []), response.get('datasets', [])):
+            if data is None:
+                continue
+            task = asyncio.create_task(post_chart(client, channel, data, user_message, [sql]))
+            CHART_TASKS.add(task)
+            task.add_done_callback(CHART_TASKS.discard)
+
+    except Exception as e:
+        print(f"Error: {e}")
+        await say(f"Sorry, an error occurred: {str(e)}")
+
+    finally:
+        if thinking_updater:
+            await thinking_updater.finish()
+        if streamer:
+            await streamer.finish()
+
+
+@app.action("show_thinking_details")
+async def handle_thinking_details(ack, body, client):
+    """Handle the Show Details button click."""
+    await ack()
+
+    try:
+        value = json.loads(body["actions"][0]["value"])
+        steps = value.get("steps", [])
+        channel = body["channel"]["id"]
+        ts = body["message"]["ts"]
+
+        blocks = create_thinking_details_blocks(steps)
+
+        await client.chat_update(channel=channel, ts=ts, text="Thinking steps", blocks=blocks)
+
+    except Exception as e:
+        print(f"Error showing details: {e}")
+
+
+@app.action("hide_thinking_details")
+async def handle_hide_details(ack, body, client):
+    """Handle the Hide Details button click."""
+    await ack()
+
+    try:
+        value = json.loads(body["actions"][0]["value"])
+        steps = value.get("steps", [])
+        channel = body["channel"]["id"]
+        ts = body["message"]["ts"]
+
+        await client.chat_update(
+            channel=channel,
+            ts=ts,
+            text="Thinking complete",
+            blocks=create_thinking_block("", steps, is_complete=True)
+        )
+
+    except Exception as e:
+        print(f"Error hiding details: {e}")
+
+
+async def init():
+    """Initialize connections."""
+    global CORTEX_AGENT, SNOWFLAKE_POOL, CHART_POOL
+
+    print("Initializing Cortex Agent + Slack (async)...")
+
+    # Fork chart workers before any other threads exist.
+    CHART_POOL = create_chart_pool(CHART_CACHE)
+
+    SNOWFLAKE_POOL = await asyncio.to_thread(create_snowflake_pool)
+
+    CORTEX_AGENT = AsyncCortexAgent(
+        agent_url=AGENT_ENDPOINT,
+        pat=PAT,
+        sql_pool=SNOWFLAKE_POOL,
+        max_result_rows=MAX_RESULT_ROWS,
+        max_result_bytes=MAX_RESULT_BYTES,
+        result_cache=create_result_cache(),
+        answer_cache=create_answer_cache(),
+        pool_size=AGENT_POOL_SIZE,
+        connect_timeout=AGENT_CONNECT_TIMEOUT,
+        read_timeout=AGENT_READ_TIMEOUT,
+        aggregate_top_n=CHART_TOP_N,
+        max_parallel_queries=MAX_PARALLEL_QUERIES
+    )
+
+    print("Initialization complete")
+    return SNOWFLAKE_POOL, CORTEX_AGENT
+
+
+async def main():
+    await init()
+
+    if not SNOWFLAKE_POOL:
+        print("Failed to connect. Check your configuration.")
+        return
+
+    print("Starting Slack bot (async)...")
+    try:
+        await AsyncSocketModeHandler(app, SLACK_APP_TOKEN).start_async()
+    finally:
+        if CHART_TASKS:
+            await asyncio.gather(*CHART_TASKS, return_exceptions=True)
+        await CORTEX_AGENT.close()
+        SNOWFLAKE_POOL.close()
+        CHART_EXECUTOR.shutdown(wait=False)
+        if CHART_POOL:
+            CHART_POOL.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,226 @@
+"""
+Async Cortex Agent Client
+asyncio variant of CortexAgent for event-loop based Slack front ends. Streams
+the SSE response with aiohttp so many conversations can share one thread.
+"""
+
+import os
+import asyncio
+import inspect
+import aiohttp
+import pandas as pd
+from dataclasses import fields
+from typing import Dict, List, Any, Optional, Callable
+
+from cortex_agent import AgentCallbacks, AgentResponse, BaseCortexAgent, _StreamState
+from sse import SSEParser
+
+
+class AsyncCortexAgent(BaseCortexAgent):
+    """
+    Async Cortex Agent API client with streaming support.
+
+    The aiohttp session is created lazily on first use so it binds to the
+    running event loop.
+
+    Usage:
+        async with AsyncCortexAgent(agent_url, pat) as agent:
+            response = await agent.chat("How many tickets by service type?")
+            print(response['text'])
+    """
+
+    def __init__(self, agent_url: str, pat: str, **kwargs):
+        super().__init__(agent_url, pat, **kwargs)
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=self.connect_timeout,
+            sock_read=self.read_timeout
+        )
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared keep-alive session, creating it on first use."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=self.pool_size)
+            )
+        return self.session
+
+    async def close(self):
+        """Close pooled HTTP connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def chat(
+        self,
+        query: str,
+        on_status: Optional[Callable[[str, List[str]], Any]] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        callbacks: Optional[AgentCallbacks] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a query to the Cortex Agent and get a response.
+
+        Args:
+            query: User's natural language question
+            on_status: Optional callback for real-time status updates, plain
+                       or async. Signature: on_status(status_message, all_steps)
+            conversation_history: Optional list of previous messages
+                       Format: [{"role": "user"|"assistant", "content": "..."}]
+            callbacks: Optional AgentCallbacks; each callback may be plain
+                       or async
+
+        Returns:
+            Dict with response data (text, sql_queries, data, datasets, etc.)
+        """
+        callbacks = self._resolve_callbacks(on_status, callbacks)
+
+        cached = self._cached_answer(query, conversation_history)
+        if cached is not None:
+            if callbacks.on_done:
+                result = callbacks.on_done(cached)
+                if inspect.isawaitable(result):
+                    await result
+            return cached.to_dict()
+
+        # The Snowflake connector is blocking, so each query runs in a worker
+        # thread, started as soon as it is extracted from the stream. The
+        # semaphore caps how many of this answer's queries hold a connection.
+        sql_tasks: Dict[str, asyncio.Task] = {}
+        sql_slots = asyncio.Semaphore(self.max_parallel_queries)
+
+        async def run_sql(sql: str) -> Optional[pd.DataFrame]:
+            async with sql_slots:
+                return await asyncio.to_thread(self._execute_sql, sql)
+
+        def start_sql(sql: str):
+            if sql not in sql_tasks and self._can_execute_sql():
+                sql_tasks[sql] = asyncio.create_task(run_sql(sql))
+
+        response = await self._stream_request(
+            query,
+            self._chain_on_sql(callbacks, start_sql),
+            conversation_history
+        )
+
+        if response.sql_queries and self._can_execute_sql():
+            # Queries parsed from the final text never reached on_sql.
+            for sql in response.sql_queries:
+                start_sql(sql)
+            datasets = await asyncio.gather(*(sql_tasks[sql] for sql in response.sql_queries))
+            self._set_datasets(response, list(datasets))
+
+        self._remember_answer(query, conversation_history, response)
+
+        return response.to_dict()
+
+    async def _stream_request(
+        self,
+        query: str,
+        callbacks: AgentCallbacks,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> AgentResponse:
+        """Make streaming request to Cortex Agent API."""
+        response = AgentResponse()
+        body = self._encode_payload(query, conversation_history, response)
+
+        state = _StreamState()
+        parser = SSEParser()
+
+        # _handle_event is synchronous, so callbacks are queued and awaited
+        # between chunks. Arguments are snapshotted when queued.
+        pending = []
+
+        def queue(callback: Callable) -> Callable:
+            def enqueue(*args):
+                pending.append((callback, [list(a) if isinstance(a, list) else a for a in args]))
+            return enqueue
+
+        queued = AgentCallbacks(**{
+            f.name: queue(getattr(callbacks, f.name))
+            for f in fields(AgentCallbacks)
+            if f.name != 'on_done' and getattr(callbacks, f.name)
+        })
+
+        async def flush():
+            for callback, args in pending:
+                result = callback(*args)
+                if inspect.isawaitable(result):
+                    await result
+            pending.clear()
+
+        try:
+            async with self._get_session().post(
+                self.agent_url,
+                data=body
+            ) as http_response:
+                if not http_response.ok:
+                    # aiohttp only pools a connection whose body was read in full.
+                    await http_response.read()
+                    http_response.raise_for_status()
+
+                done = False
+                async for chunk in http_response.content.iter_any():
+                    for event in parser.feed(chunk):
+                        if not self._handle_event(event, state, response, queued):
+                            done = True
+                            break
+
+                    await flush()
+                    if done:
+                        break
+
+                # Drain anything after [DONE] so the connection is reused.
+                await http_response.read()
+
+            response.text = ''.join(state.text).strip()
+
+        except asyncio.TimeoutError:
+            response.text = response.error = "Request timed out. Please try again."
+        except aiohttp.ClientError as e:
+            response.text = response.error = f"Request failed: {str(e)}"
+        except Exception as e:
+            response.text = response.error = f"Unexpected error: {str(e)}"
+
+        if callbacks.on_done:
+            result = callbacks.on_done(response)
+            if inspect.isawaitable(result):
+                await result
+
+        return response
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    async def main():
+        async with AsyncCortexAgent(
+            agent_url=os.getenv("AGENT_ENDPOINT"),
+            pat=os.getenv("PAT"),
+            debug=True
+        ) as agent:
+            async def status_callback(status, steps):
+                print(f"  -> {status} ({len(steps)} steps)")
+
+            print("\nTesting Async Cortex Agent...\n")
+
+            response = await agent.chat(
+                "How many tickets by service type?",
+                on_status=status_callback
+            )
+
+            print("\n" + "="*60)
+            print("RESPONSE:")
+            print("="*60)
+            print(response.get('text', 'No text'))
+
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Chart Rendering Micro-benchmark
+Times ChartGenerator.render for each chart type at 5, 20 and 50 rows and
+reports milliseconds per chart (best of several rounds, PNG bytes in memory,
+chart cache disabled) with and without palette PNGs, then the PNG size of
+each chart against the previous 150 DPI full-color output, with the bytes
+saved and the savefig (draw) and palette re-encode times.
+
+Run:
+    python bot/bench_charts.py           # 5 rounds per cell
+    python bot/bench_charts.py 10        # more rounds
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from charts import ChartGenerator
+
+CHART_TYPES = ['bar', 'horizontal_bar', 'pie', 'line']
+ROW_COUNTS = [5, 20, 50]
+DEFAULT_ROUNDS = 5
+
+
+def build_data(chart_type: str, rows: int) -> pd.DataFrame:
+    """Result-shaped data for one chart type and row count."""
+    rng = np.random.default_rng(rows)
+    if chart_type == 'line':
+        return pd.DataFrame({
+            'day': pd.date_range('2025-01-01', periods=rows, freq='D').strftime('%Y-%m-%d'),
+            'tickets': rng.integers(50, 3000, rows)
+        })
+    return pd.DataFrame({
+        'service_type': [f'Service {i}' for i in range(rows)],
+        'ticket_count': rng.integers(10, 5000, rows)
+    })
+
+
+def time_render(generator: ChartGenerator, data: pd.DataFrame, chart_type: str, rounds: int) -> float:
+    """Best-of-N render time in milliseconds."""
+    spec = {'type': chart_type, 'title': 'Tickets By Service Type'}
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        chart_info = generator.render(data, spec)
+        best = min(best, time.perf_counter() - start)
+        assert chart_info and chart_info['image'], f"{chart_type} chart failed to render"
+    return best * 1000
+
+
+def compare_sizes(generator: ChartGenerator, legacy: ChartGenerator, data: pd.DataFrame, chart_type: str):
+    """(legacy bytes, compact bytes, compact draw ms, compact encode ms) for one chart."""
+    spec = {'type': chart_type, 'title': 'Tickets By Service Type'}
+    before = legacy.render(data, spec)
+    after = generator.render(data, spec)
+    return before['png_bytes'], after['png_bytes'], after['draw_ms'], after['encode_ms']
+
+
+def print_timings(generator: ChartGenerator, rounds: int):
+    print(f"  {'chart type':<16}" + ''.join(f"{f'{rows} rows':>12}" for rows in ROW_COUNTS))
+    for chart_type in CHART_TYPES:
+        timings = [
+            time_render(generator, build_data(chart_type, rows), chart_type, rounds)
+            for rows in ROW_COUNTS
+        ]
+        print(f"  {chart_type:<16}" + ''.join(f"{ms:12.1f}" for ms in timings))
+
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROUNDS
+
+    generator = ChartGenerator(in_memory=True)
+    compact = ChartGenerator(in_memory=True, palette=True)
+    # Load fonts and fill matplotlib's caches before timing.
+    generator.render(build_data('bar', 5), {'type': 'bar', 'title': 'Warm-up'})
+
+    print(f"ms per chart, full-color PNG (best of {rounds})")
+    print_timings(generator, rounds)
+    print()
+    print(f"ms per chart, palette PNG (best of {rounds})")
+    print_timings(compact, rounds)
+
+    legacy = ChartGenerator(in_memory=True, dpi=150)
+    print()
+    print("PNG size per chart: 150 DPI RGBA -> palette (saved, draw ms + encode ms)")
+    for chart_type in CHART_TYPES:
+        cells = []
+        for rows in ROW_COUNTS:
+            before, after, draw_ms, encode_ms = compare_sizes(compact, legacy, build_data(chart_type, rows), chart_type)
+            cells.append(
+                f"{before / 1024:5.0f} -> {after / 1024:3.0f} KB "
+                f"({1 - after / before:4.0%}, {draw_ms:3.0f} + {encode_ms:3.0f} ms)"
+            )
+        print(f"  {chart_type:<16}" + "   ".join(cells))
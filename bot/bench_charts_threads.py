@@ -0,0 +1,76 @@
+"""
+Chart Thread-Scaling Benchmark
+Renders the same mix of bar, horizontal bar, pie and line charts with 1, 2,
+4 and 8 threads sharing one ChartGenerator, and reports charts per second.
+Every threaded render is compared byte-for-byte with a single-threaded
+reference, which would catch threads drawing onto each other's figures.
+
+Run:
+    python bot/bench_charts_threads.py          # 64 charts per thread count
+    python bot/bench_charts_threads.py 200      # more charts per round
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from charts import ChartGenerator
+
+THREAD_COUNTS = [1, 2, 4, 8]
+DEFAULT_CHARTS = 64
+
+
+def build_workload() -> List[Tuple[pd.DataFrame, str]]:
+    """One (data, question) pair per chart type the planner can pick."""
+    services = ['Cellular', 'Business Internet', 'Home Internet', 'TV', 'Landline', 'Wireless', 'Fiber']
+    rng = np.random.default_rng(0)
+    return [
+        (pd.DataFrame({'service_type': services[:5], 'ticket_count': rng.integers(10, 500, 5)}),
+         "How many tickets by service type?"),
+        (pd.DataFrame({'agent_name': [f'Agent {i}' for i in range(20)], 'resolved': rng.integers(1, 90, 20)}),
+         "Which agents resolved the most tickets?"),
+        (pd.DataFrame({'service_type': services[:6], 'ticket_count': rng.integers(10, 500, 6)}),
+         "Show me a breakdown of tickets by service type"),
+        (pd.DataFrame({'month': [f'2025-{m:02d}' for m in range(1, 13)], 'tickets': rng.integers(50, 300, 12)}),
+         "Show the ticket trend over time"),
+    ]
+
+
+def render_all(generator: ChartGenerator, jobs, threads: int) -> Tuple[float, List[bytes]]:
+    """Render every job on a pool of threads; returns (seconds, PNG bytes in job order)."""
+    def render(job):
+        data, question = job
+        return generator.analyze_and_generate(data, question, ["SELECT 1"])['image']
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        images = list(executor.map(render, jobs))
+        return time.perf_counter() - start, images
+
+
+if __name__ == "__main__":
+    charts = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHARTS
+
+    generator = ChartGenerator(in_memory=True)
+    workload = build_workload()
+    jobs = [workload[i % len(workload)] for i in range(charts)]
+
+    # Reference images, also warming up fonts and matplotlib caches.
+    reference = [render_all(generator, [job], 1)[1][0] for job in workload]
+    expected = [reference[i % len(workload)] for i in range(charts)]
+
+    print(f"Rendering {charts} charts ({len(workload)} chart types)")
+    baseline = None
+    for threads in THREAD_COUNTS:
+        elapsed, images = render_all(generator, jobs, threads)
+        mismatched = sum(image != want for image, want in zip(images, expected))
+        baseline = baseline or elapsed
+        print(
+            f"  {threads} thread{'s' if threads > 1 else ' '} : {charts / elapsed:6.1f} charts/s"
+            f"  ({elapsed / charts * 1000:6.1f} ms/chart, {baseline / elapsed:.2f}x)"
+            f"  mismatched images: {mismatched}"
+        )
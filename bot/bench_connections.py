@@ -0,0 +1,114 @@
+"""
+Connection Reuse Check
+Serves a canned agent stream (and HTTP 500 errors) from a local HTTP/1.1
+server and counts the TCP connections the server accepts while the sync and
+async agents answer several questions in a row. With keep-alive pooling each
+run should need exactly one connection; the script exits non-zero otherwise.
+
+Run:
+    python bot/bench_connections.py          # 3 chats per run
+    python bot/bench_connections.py 10       # more chats
+"""
+
+import sys
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cortex_agent import CortexAgent
+from async_cortex_agent import AsyncCortexAgent
+
+DEFAULT_CHATS = 3
+
+STREAM = b"".join(
+    f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+    for event, data in [
+        ('response.status', {'message': 'Planning'}),
+        ('response.text.delta', {'text': 'Forty-two tickets.'}),
+    ]
+) + b"data: [DONE]\n\n" + b"event: response.status\ndata: {\"message\": \"after done\"}\n\n"
+
+ERROR_BODY = b'{"message": "internal error"}'
+
+
+class AgentHandler(BaseHTTPRequestHandler):
+    """Answers POST / with STREAM in chunks and POST /error with a 500."""
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with AgentHandler.lock:
+            AgentHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        if self.path.startswith('/error'):
+            self.send_response(500)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(ERROR_BODY)))
+            self.end_headers()
+            self.wfile.write(ERROR_BODY)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for start in range(0, len(STREAM), 64):
+            piece = STREAM[start:start + 64]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def count_connections(run) -> int:
+    """Connections the server accepted while run() executed."""
+    before = AgentHandler.connections
+    run()
+    return AgentHandler.connections - before
+
+
+def sync_chats(url: str, chats: int):
+    with CortexAgent(url, "pat") as agent:
+        for _ in range(chats):
+            agent.chat("How many tickets?")
+
+
+def async_chats(url: str, chats: int):
+    async def run():
+        async with AsyncCortexAgent(url, "pat") as agent:
+            for _ in range(chats):
+                await agent.chat("How many tickets?")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    chats = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHATS
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), AgentHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    runs = [
+        ("sync, streamed answers", lambda: sync_chats(f"{base}/", chats)),
+        ("sync, HTTP 500", lambda: sync_chats(f"{base}/error", chats)),
+        ("async, streamed answers", lambda: async_chats(f"{base}/", chats)),
+        ("async, HTTP 500", lambda: async_chats(f"{base}/error", chats)),
+    ]
+
+    failed = False
+    print(f"TCP connections for {chats} chats (1 means every chat reused the pooled connection)")
+    for name, run in runs:
+        connections = count_connections(run)
+        failed |= connections != 1
+        print(f"  {name:<26}{connections:3d}{'' if connections == 1 else '  <- not reused'}")
+
+    server.shutdown()
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,371 @@
+"""
+Chart Render Pool
+Persistent worker processes for matplotlib rendering, so savefig CPU time
+stays off the Slack handler threads and out of the main process's GIL.
+
+Workers are forked with matplotlib already imported and the chart style
+applied. Each job is a pickled DataFrame plus the chart spec chosen in the
+parent by ChartGenerator.plan(). Repeated charts are served from a ChartCache
+held in the parent, so they never reach a worker.
+
+Jobs wait in the parent until a worker is free, so CHART_TIMEOUT counts only
+rendering time, never time spent queued behind other charts.
+"""
+
+import time
+import pickle
+import asyncio
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+import pandas as pd
+
+from config import (
+    CHART_WORKERS, CHART_TIMEOUT, CHART_IN_MEMORY, CHART_TOP_N, CHART_MAX_POINTS,
+    CHART_DPI, CHART_PNG_PALETTE, CHART_CACHE_MAX_BYTES, CHART_CACHE_MAX_ENTRIES
+)
+from charts import ChartCache, ChartGenerator, chart_cache_key
+
+# Set in each worker process by _init_worker.
+_WORKER_GENERATOR: Optional[ChartGenerator] = None
+
+
+def _init_worker(output_dir: Optional[str], options: Dict[str, Any]):
+    global _WORKER_GENERATOR
+    _WORKER_GENERATOR = ChartGenerator(output_dir, **options)
+
+
+def _ready() -> bool:
+    return True
+
+
+def _render_job(frame: bytes, spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Worker-side entry point: rebuild the DataFrame and render the spec."""
+    return _WORKER_GENERATOR.render(pickle.loads(frame), spec)
+
+
+def _replacement_context():
+    """
+    Start method for pools created after startup. Forking a process that
+    already runs other threads can copy a held lock into the child, so
+    replacement workers come from a forkserver (or spawn) instead. The
+    server preloads only the chart modules, so workers start with matplotlib
+    loaded; multiprocessing still imports the main script in each worker as
+    __mp_main__, which app.py keeps free of network calls.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["charts", __name__])
+    return context
+
+
+@dataclass
+class _RenderJob:
+    """A chart waiting for, or running on, a worker process."""
+    frame: bytes
+    spec: Dict[str, Any]
+    future: Future
+    started: float = 0.0
+    executor: Optional[ProcessPoolExecutor] = None
+    attempt: Optional[Future] = None
+
+
+class ChartRenderPool:
+    """
+    Process pool that renders charts with a per-job timeout.
+
+    Create it before other threads start (e.g. first thing in init()) so
+    workers are forked from a single-threaded process. Pools replaced after
+    a timeout or crash start their workers with forkserver (or spawn), since
+    by then the process runs Slack, HTTP and Snowflake threads.
+
+    Usage:
+        pool = ChartRenderPool(max_workers=2, timeout=30, in_memory=True)
+        pool.warm_up()
+        chart_info = pool.render(df, question, sql_queries)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        timeout: float = 30,
+        output_dir: Optional[str] = None,
+        in_memory: bool = False,
+        cache: Optional[ChartCache] = None,
+        top_n: int = 15,
+        max_points: int = 200,
+        dpi: int = 100,
+        palette: bool = False
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.output_dir = output_dir
+        self.in_memory = in_memory
+        self.cache = cache if in_memory else None
+        # Shared by the parent's planner and each worker's renderer.
+        self._generator_options = {
+            'in_memory': in_memory,
+            'top_n': top_n,
+            'max_points': max_points,
+            'dpi': dpi,
+            'palette': palette
+        }
+        self.planner = ChartGenerator(output_dir, **self._generator_options)
+        self._lock = threading.Lock()
+        self._pending: Deque[_RenderJob] = deque()
+        self._running: List[_RenderJob] = []
+        self._closed = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._executor = self._create_executor(multiprocessing.get_context("fork"))
+
+    def warm_up(self):
+        """Start every worker now rather than on the first chart."""
+        self._warm_up(self._executor)
+
+    def submit(
+        self,
+        data: pd.DataFrame,
+        question: str,
+        sql_queries: List[str] = None
+    ) -> Optional[Future]:
+        """Queue a render; returns None when the data does not warrant a chart."""
+        spec = self.planner.plan(data, question, sql_queries)
+        if not spec:
+            return None
+
+        # Large results are reduced here so only plottable rows are shipped.
+        data = self.planner.prepare(data, spec)
+
+        if self.cache:
+            spec['key'] = chart_cache_key(data, spec['type'], spec['title'])
+            image = self.cache.get(spec['key']) if spec['key'] else None
+            if image is not None:
+                future = Future()
+                future.set_result({'image': image, **spec})
+                return future
+
+        job = _RenderJob(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), spec, Future())
+        if self.cache and spec['key']:
+            job.future.add_done_callback(self._cache_result)
+
+        with self._lock:
+            self._pending.append(job)
+        self._dispatch()
+        return job.future
+
+    def render(
+        self,
+        data: pd.DataFrame,
+        question: str,
+        sql_queries: List[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Render a chart in a worker process. A job that runs longer than the
+        timeout once a worker picks it up is abandoned.
+
+        Returns:
+            Dict with 'path' (or 'image' bytes), 'type', 'title' or None
+        """
+        future = self.submit(data, question, sql_queries)
+        if future is None:
+            return None
+
+        try:
+            return future.result()
+        except TimeoutError:
+            print(f"Chart render timed out after {self.timeout}s")
+        except BrokenProcessPool:
+            print("Chart worker crashed")
+        except RuntimeError as e:
+            print(f"Chart render failed: {e}")
+        return None
+
+    async def render_async(
+        self,
+        data: pd.DataFrame,
+        question: str,
+        sql_queries: List[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """asyncio counterpart of render()."""
+        future = self.submit(data, question, sql_queries)
+        if future is None:
+            return None
+
+        try:
+            return await asyncio.wrap_future(future)
+        except TimeoutError:
+            print(f"Chart render timed out after {self.timeout}s")
+        except BrokenProcessPool:
+            print("Chart worker crashed")
+        except RuntimeError as e:
+            print(f"Chart render failed: {e}")
+        return None
+
+    def close(self):
+        """Stop the worker processes and drop queued charts."""
+        self._closed.set()
+        with self._lock:
+            pending, self._pending = list(self._pending), deque()
+            executor = self._executor
+        for job in pending:
+            # Requeued jobs are already running, so fail them rather than cancel.
+            if job.future.running() or job.future.set_running_or_notify_cancel():
+                job.future.set_exception(RuntimeError("Chart pool closed"))
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _cache_result(self, future: Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        chart_info = future.result()
+        if chart_info and chart_info.get('image'):
+            self.cache.put(chart_info['key'], chart_info['image'])
+
+    def _dispatch(self):
+        """Hand queued jobs to the executor while a worker is free."""
+        while True:
+            with self._lock:
+                if (
+                    self._closed.is_set()
+                    or self._executor is None
+                    or len(self._running) >= self.max_workers
+                    or not self._pending
+                ):
+                    return
+                job = self._pending.popleft()
+                # Jobs requeued after a restart are already running.
+                if not job.future.running() and not job.future.set_running_or_notify_cancel():
+                    continue
+                job.started = time.monotonic()
+                job.executor = self._executor
+                job.attempt = None
+                self._running.append(job)
+                if self._watchdog is None:
+                    self._watchdog = threading.Thread(target=self._watch, name="chart-watchdog", daemon=True)
+                    self._watchdog.start()
+
+            try:
+                attempt = job.executor.submit(_render_job, job.frame, job.spec)
+            except (BrokenProcessPool, RuntimeError) as e:
+                attempt = Future()
+                attempt.set_exception(e)
+            job.attempt = attempt
+            attempt.add_done_callback(lambda done, job=job: self._finish(job, done))
+
+    def _finish(self, job: _RenderJob, done: Future):
+        with self._lock:
+            if job not in self._running or done is not job.attempt:
+                # Timed out, or requeued after a restart.
+                return
+            self._running.remove(job)
+
+        if done.cancelled():
+            # close() cancelled the attempt; callers still need an answer.
+            job.future.set_exception(RuntimeError("Chart pool closed"))
+            return
+
+        error = done.exception()
+        if error is None:
+            job.future.set_result(done.result())
+        else:
+            if isinstance(error, BrokenProcessPool):
+                self._restart(job.executor)
+            job.future.set_exception(error)
+        self._dispatch()
+
+    def _watch(self):
+        """Abandon jobs that have been rendering longer than the timeout."""
+        while not self._closed.wait(min(1.0, self.timeout / 4)):
+            now = time.monotonic()
+            with self._lock:
+                expired = [job for job in self._running if now - job.started > self.timeout]
+                if not expired:
+                    continue
+                failed = expired[0].executor
+                # Other jobs on the recycled workers start over on the new pool.
+                requeue = [job for job in self._running if job.executor is failed and job not in expired]
+                self._running = [job for job in self._running if job.executor is not failed]
+                self._pending.extendleft(reversed(requeue))
+
+            for job in expired:
+                job.future.set_exception(TimeoutError())
+            print("Restarting chart workers")
+            self._restart(failed)
+            self._dispatch()
+
+    def _create_executor(self, context=None) -> ProcessPoolExecutor:
+        if context is None:
+            context = _replacement_context()
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.output_dir, self._generator_options)
+        )
+
+    def _warm_up(self, executor: ProcessPoolExecutor):
+        # Fork pools launch every worker on the first submit; forkserver and
+        # spawn pools launch one per submit while none is idle.
+        for future in [executor.submit(_ready) for _ in range(self.max_workers)]:
+            future.result(self.timeout)
+
+    def _restart(self, failed: ProcessPoolExecutor):
+        """Replace the failed executor, killing workers stuck on a timed-out job."""
+        with self._lock:
+            if self._executor is not failed or self._closed.is_set():
+                return
+            # Queued jobs wait until the new workers are up, so worker start-up
+            # is not charged to their timeout.
+            self._executor = None
+
+        # ProcessPoolExecutor has no public way to stop a running job.
+        processes = list((getattr(failed, '_processes', None) or {}).values())
+        failed.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+        executor = self._create_executor()
+        try:
+            self._warm_up(executor)
+        except Exception as e:
+            print(f"Chart worker start-up failed: {e}")
+
+        with self._lock:
+            if not self._closed.is_set():
+                self._executor, executor = executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._dispatch()
+
+
+def create_chart_pool(cache: Optional[ChartCache] = None) -> Optional[ChartRenderPool]:
+    """Create and start the shared chart pool (None when CHART_WORKERS is 0)."""
+    if CHART_WORKERS <= 0:
+        return None
+
+    pool = ChartRenderPool(
+        max_workers=CHART_WORKERS,
+        timeout=CHART_TIMEOUT,
+        in_memory=CHART_IN_MEMORY,
+        cache=cache,
+        top_n=CHART_TOP_N,
+        max_points=CHART_MAX_POINTS,
+        dpi=CHART_DPI,
+        palette=CHART_PNG_PALETTE
+    )
+    pool.warm_up()
+    return pool
+
+
+def create_chart_cache() -> Optional[ChartCache]:
+    """Create the shared chart cache (None when disabled or not rendering in memory)."""
+    if CHART_CACHE_MAX_BYTES <= 0 or not CHART_IN_MEMORY:
+        return None
+
+    return ChartCache(max_bytes=CHART_CACHE_MAX_BYTES, max_entries=CHART_CACHE_MAX_ENTRIES)
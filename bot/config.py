@@ -0,0 +1,60 @@
+"""
+Environment configuration shared by the sync and async Slack front ends.
+"""
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ACCOUNT = os.getenv("ACCOUNT")
+USER = os.getenv("DEMO_USER")
+ROLE = os.getenv("DEMO_USER_ROLE", "cortex_agent_slack_role")
+WAREHOUSE = os.getenv("WAREHOUSE", "SFE_CORTEX_AGENT_SLACK_WH")
+SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
+SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
+AGENT_ENDPOINT = os.getenv("AGENT_ENDPOINT")
+PAT = os.getenv("PAT")
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "10"))
+AGENT_CONNECT_TIMEOUT = float(os.getenv("AGENT_CONNECT_TIMEOUT", "10"))
+AGENT_READ_TIMEOUT = float(os.getenv("AGENT_READ_TIMEOUT", "120"))
+SLACK_CONCURRENCY = int(os.getenv("SLACK_CONCURRENCY", "10"))
+SNOWFLAKE_POOL_SIZE = int(os.getenv("SNOWFLAKE_POOL_SIZE", "4"))
+SNOWFLAKE_CHECKOUT_TIMEOUT = float(os.getenv("SNOWFLAKE_CHECKOUT_TIMEOUT", "30"))
+SNOWFLAKE_IDLE_TIMEOUT = float(os.getenv("SNOWFLAKE_IDLE_TIMEOUT", "600"))
+MAX_RESULT_ROWS = int(os.getenv("MAX_RESULT_ROWS", "10000"))
+MAX_RESULT_BYTES = int(os.getenv("MAX_RESULT_BYTES", str(50 * 1024 * 1024)))
+MAX_PARALLEL_QUERIES = int(os.getenv("MAX_PARALLEL_QUERIES", "3"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR")
+RESULT_CACHE_DISK_MAX_BYTES = int(os.getenv("RESULT_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "0"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))
+ANSWER_CACHE_MAX_BYTES = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+STATUS_UPDATE_INTERVAL = float(os.getenv("STATUS_UPDATE_INTERVAL", "1.0"))
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() in ("1", "true", "yes")
+STREAM_UPDATE_INTERVAL = float(os.getenv("STREAM_UPDATE_INTERVAL", "1.0"))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "4"))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "20"))
+MAX_QUEUED_PER_USER = int(os.getenv("MAX_QUEUED_PER_USER", "2"))
+CONVERSATION_BACKEND = os.getenv("CONVERSATION_BACKEND", "memory").lower()
+CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", ".cache/conversations.db")
+CONVERSATION_MAX_KEYS = int(os.getenv("CONVERSATION_MAX_KEYS", "10000"))
+CONVERSATION_MAX_BYTES = int(os.getenv("CONVERSATION_MAX_BYTES", str(64 * 1024 * 1024)))
+MAX_HISTORY_LENGTH = int(os.getenv("MAX_HISTORY_LENGTH", "10"))  # Keep last N message pairs
+HISTORY_TTL_SECONDS = float(os.getenv("HISTORY_TTL_SECONDS", "3600"))  # Clear history after 1 hour of inactivity
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+HISTORY_FULL_TURNS = int(os.getenv("HISTORY_FULL_TURNS", "1"))
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "2"))
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "60"))
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+CHART_TIMEOUT = float(os.getenv("CHART_TIMEOUT", "30"))
+CHART_THREADS = int(os.getenv("CHART_THREADS", "1"))
+CHART_IN_MEMORY = os.getenv("CHART_IN_MEMORY", "true").lower() in ("1", "true", "yes")
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CHART_CACHE_MAX_ENTRIES = int(os.getenv("CHART_CACHE_MAX_ENTRIES", "256"))
+CHART_TOP_N = int(os.getenv("CHART_TOP_N", "15"))
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "200"))
+CHART_DPI = int(os.getenv("CHART_DPI", "100"))
+CHART_PNG_PALETTE = os.getenv("CHART_PNG_PALETTE", "false").lower() in ("1", "true", "yes")
@@ -0,0 +1,396 @@
+"""
+Conversation history for threaded follow-up questions.
+
+History lives behind a ConversationStore. The default keeps it in memory,
+bounded by key count and bytes with LRU eviction and a background TTL
+sweeper; the SQLite backend (WAL mode) lets several bot processes on one host
+share thread context and keeps it across restarts.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    CONVERSATION_BACKEND, CONVERSATION_DB_PATH, CONVERSATION_MAX_KEYS,
+    CONVERSATION_MAX_BYTES, MAX_HISTORY_LENGTH, HISTORY_TTL_SECONDS,
+    HISTORY_TOKEN_BUDGET, HISTORY_FULL_TURNS
+)
+
+Message = Dict[str, str]
+
+
+def get_conversation_key(event: dict) -> str:
+    """Get unique conversation key from Slack event (thread_ts or channel)."""
+    thread_ts = event.get('thread_ts')
+    channel = event.get('channel', '')
+
+    # If in a thread, use thread_ts as key
+    if thread_ts:
+        return f"{channel}:{thread_ts}"
+    # For DMs without threads, use channel (each DM channel is unique per user)
+    return channel
+
+
+# Markdown tables and fenced code blocks dominate long answers but rarely
+# matter as context for a follow-up question.
+_TABLE_LINE = re.compile(r'^\s*\|.*\|\s*$', re.MULTILINE)
+_CODE_BLOCK = re.compile(r'```.*?(?:```|$)', re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def summarize_message(content: str, max_chars: int = 600) -> str:
+    """Shorten an older assistant answer to its first paragraph of prose."""
+    text = _CODE_BLOCK.sub('', _TABLE_LINE.sub('', content))
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text) if p.strip()]
+    summary = paragraphs[0] if paragraphs else ''
+    if len(summary) > max_chars:
+        summary = summary[:max_chars].rsplit(' ', 1)[0] + '...'
+    return summary
+
+
+def compact_history(messages: List[Message], token_budget: int, full_turns: int = 1) -> List[Message]:
+    """
+    Fit history into an approximate token budget.
+
+    The newest full_turns user/assistant pairs are kept verbatim. Older
+    assistant answers are summarized, and if that is not enough the oldest
+    turns are dropped.
+
+    Args:
+        messages: History, oldest first
+        token_budget: Approximate token budget (0 or less disables compaction)
+        full_turns: Number of newest turns never shortened
+
+    Returns:
+        Compacted history of whole user/assistant pairs, starting with a user message
+    """
+    def total(msgs):
+        return sum(estimate_tokens(m["content"]) for m in msgs)
+
+    def flatten(turns):
+        return [m for turn in turns for m in turn]
+
+    if token_budget <= 0 or total(messages) <= token_budget:
+        return messages
+
+    # Work in whole user+assistant turns so the result keeps alternating
+    # roles; a user message without an answer is dropped.
+    turns = [
+        (messages[i], messages[i + 1])
+        for i in range(len(messages) - 1)
+        if messages[i]["role"] == "user" and messages[i + 1]["role"] == "assistant"
+    ]
+
+    keep = max(full_turns, 0)
+    split = max(len(turns) - keep, 0)
+    compacted = [
+        (user, {"role": "assistant", "content": summarize_message(answer["content"])})
+        for user, answer in turns[:split]
+    ] + turns[split:]
+
+    while len(compacted) > keep and total(flatten(compacted)) > token_budget:
+        compacted.pop(0)
+
+    return flatten(compacted)
+
+
+class ConversationStore(ABC):
+    """
+    Interface for conversation history backends.
+
+    Subclasses implement get, append and sweep; start_sweeper runs sweep
+    periodically on a daemon thread so abandoned threads expire even if
+    nobody reads them again.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_messages: int = 20):
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    @abstractmethod
+    def get(self, key: str) -> List[Message]:
+        """Messages for key, oldest first (empty if unknown or expired)."""
+
+    @abstractmethod
+    def append(self, key: str, role: str, content: str):
+        """Add a message to key, keeping at most max_messages."""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Drop expired conversations; returns how many were removed."""
+
+    def start_sweeper(self, interval: float = 60):
+        """Run sweep every interval seconds on a background thread."""
+        if self._sweeper is not None:
+            return
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, args=(interval,), daemon=True, name="conversation-sweeper"
+        )
+        self._sweeper.start()
+
+    def close(self):
+        """Stop the sweeper and release resources."""
+        self._stop.set()
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Conversation sweep failed: {e}")
+
+
+class MemoryConversationStore(ConversationStore):
+    """
+    In-process history bounded by conversation count and approximate bytes.
+
+    Usage:
+        store = MemoryConversationStore(max_keys=10000, max_bytes=64 * 1024 * 1024)
+        store.append(key, "user", "How many tickets?")
+        history = store.get(key)
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_messages: int = 20,
+        max_keys: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024
+    ):
+        super().__init__(ttl_seconds, max_messages)
+        self.max_keys = max_keys
+        self.max_bytes = max_bytes
+
+        # key -> (messages, last activity, size); ordered least recently used first.
+        self._entries: "OrderedDict[str, Tuple[List[Message], float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> List[Message]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return []
+            messages, updated_at, _ = entry
+            if time.time() - updated_at > self.ttl_seconds:
+                self._remove_locked(key)
+                return []
+            self._entries.move_to_end(key)
+            return list(messages)
+
+    def append(self, key: str, role: str, content: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            messages = []
+            if entry is not None:
+                if now - entry[1] <= self.ttl_seconds:
+                    messages = entry[0]
+                self._remove_locked(key)
+
+            messages = (messages + [{"role": role, "content": content}])[-self.max_messages:]
+            size = sum(_message_size(m) for m in messages)
+            self._entries[key] = (messages, now, size)
+            self._bytes += size
+
+            while len(self._entries) > 1 and (len(self._entries) > self.max_keys or self._bytes > self.max_bytes):
+                self._remove_locked(next(iter(self._entries)))
+
+    def sweep(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [key for key, (_, updated_at, _) in self._entries.items() if updated_at < cutoff]
+            for key in expired:
+                self._remove_locked(key)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        """Current size."""
+        with self._lock:
+            return {'conversations': len(self._entries), 'bytes': self._bytes}
+
+    def _remove_locked(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    History in a local SQLite database in WAL mode, shared by every bot
+    process on the host and kept across restarts.
+
+    Usage:
+        store = SQLiteConversationStore(".cache/conversations.db")
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, max_messages: int = 20):
+        super().__init__(ttl_seconds, max_messages)
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                key TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS conversation_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS conversation_messages_key
+                ON conversation_messages (key, id);
+            CREATE INDEX IF NOT EXISTS conversations_updated_at
+                ON conversations (updated_at);
+        """)
+
+    def get(self, key: str) -> List[Message]:
+        conn = self._conn()
+        row = conn.execute("SELECT updated_at FROM conversations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return []
+        if time.time() - row[0] > self.ttl_seconds:
+            self._delete(conn, key)
+            return []
+
+        rows = conn.execute(
+            "SELECT role, content FROM conversation_messages WHERE key = ? ORDER BY id DESC LIMIT ?",
+            (key, self.max_messages)
+        ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def append(self, key: str, role: str, content: str):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT updated_at FROM conversations WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[0] > self.ttl_seconds:
+                conn.execute("DELETE FROM conversation_messages WHERE key = ?", (key,))
+
+            conn.execute(
+                "INSERT INTO conversations (key, updated_at) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET updated_at = excluded.updated_at",
+                (key, now)
+            )
+            conn.execute(
+                "INSERT INTO conversation_messages (key, role, content) VALUES (?, ?, ?)",
+                (key, role, content)
+            )
+            conn.execute(
+                "DELETE FROM conversation_messages WHERE key = ? AND id NOT IN "
+                "(SELECT id FROM conversation_messages WHERE key = ? ORDER BY id DESC LIMIT ?)",
+                (key, key, self.max_messages)
+            )
+
+    def sweep(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM conversation_messages WHERE key IN "
+                "(SELECT key FROM conversations WHERE updated_at < ?)",
+                (cutoff,)
+            )
+            return conn.execute("DELETE FROM conversations WHERE updated_at < ?", (cutoff,)).rowcount
+
+    def close(self):
+        super().close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection (sqlite3 connections are not shared across threads)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions.
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, key: str):
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM conversation_messages WHERE key = ?", (key,))
+            conn.execute("DELETE FROM conversations WHERE key = ?", (key,))
+
+
+def _message_size(message: Message) -> int:
+    return len(message["role"]) + len(message["content"].encode('utf-8'))
+
+
+def create_conversation_store() -> ConversationStore:
+    """Create the conversation store selected by CONVERSATION_BACKEND."""
+    max_messages = MAX_HISTORY_LENGTH * 2  # Keep last N message pairs
+
+    if CONVERSATION_BACKEND == "sqlite":
+        store = SQLiteConversationStore(
+            CONVERSATION_DB_PATH,
+            ttl_seconds=HISTORY_TTL_SECONDS,
+            max_messages=max_messages
+        )
+    else:
+        store = MemoryConversationStore(
+            ttl_seconds=HISTORY_TTL_SECONDS,
+            max_messages=max_messages,
+            max_keys=CONVERSATION_MAX_KEYS,
+            max_bytes=CONVERSATION_MAX_BYTES
+        )
+
+    store.start_sweeper(interval=min(HISTORY_TTL_SECONDS, 300))
+    return store
+
+
+_STORE: Optional[ConversationStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """The process-wide store, created from configuration on first use."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = create_conversation_store()
+    return _STORE
+
+
+def set_conversation_store(store: ConversationStore):
+    """Replace the process-wide store (e.g. with a pre-configured backend)."""
+    global _STORE
+    with _STORE_LOCK:
+        _STORE = store
+
+
+def get_conversation_history(key: str) -> List[Message]:
+    """Get conversation history fitted to the token budget, empty if expired."""
+    return compact_history(get_conversation_store().get(key), HISTORY_TOKEN_BUDGET, HISTORY_FULL_TURNS)
+
+
+def add_to_conversation(key: str, role: str, content: str):
+    """Add a message to conversation history."""
+    get_conversation_store().append(key, role, content)
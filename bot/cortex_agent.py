@@ -7,10 +7,18 @@ real-time status callbacks, SQL query extraction, and verified query detection.
 import os
 import json
 import re
+import threading
 import requests
+from collections import deque
+from requests.adapters import HTTPAdapter
 import pandas as pd
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+
+from sse import SSEEvent, SSEParser
+from sql_pushdown import limit_sql, top_n_sql
+from data_profile import profile_data
 
 
 @dataclass
@@ -24,6 +32,9 @@ class AgentResponse:
     planning_steps: List[str] = field(default_factory=list)
     thinking_content: List[str] = field(default_factory=list)
     data: Optional[pd.DataFrame] = None
+    datasets: List[Optional[pd.DataFrame]] = field(default_factory=list)
+    error: Optional[str] = None
+    request_bytes: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for Slack display."""
@@ -34,19 +45,43 @@ class AgentResponse:
             'suggestions': self.suggestions,
             'verified_query_used': self.verified_query_used,
             'planning_steps': self.planning_steps,
-            'data': self.data
+            'thinking_content': self.thinking_content,
+            'data': self.data,
+            'datasets': self.datasets,
+            'request_bytes': self.request_bytes
         }
 
 
-class CortexAgent:
+@dataclass
+class AgentCallbacks:
     """
-    Cortex Agent API client with streaming support.
+    Optional subscriptions to agent events as they stream in.
 
-    Usage:
-        agent = CortexAgent(agent_url, pat)
-        response = agent.chat("How many tickets by service type?")
-        print(response.text)
-        print(response.data)
+    Callbacks run on the thread reading the stream (or, for the async client,
+    may be coroutines awaited between chunks), so they should return quickly.
+    """
+    on_status: Optional[Callable[[str, List[str]], Any]] = None
+    on_text_delta: Optional[Callable[[str], Any]] = None
+    on_thinking_delta: Optional[Callable[[str], Any]] = None
+    on_tool_result: Optional[Callable[[Dict[str, Any]], Any]] = None
+    on_sql: Optional[Callable[[str], Any]] = None
+    on_done: Optional[Callable[[AgentResponse], Any]] = None
+
+
+@dataclass
+class _StreamState:
+    """Deltas collected across one SSE stream, joined once at the end."""
+    text: List[str] = field(default_factory=list)
+    thinking: List[str] = field(default_factory=list)
+
+
+class BaseCortexAgent:
+    """
+    Transport-independent pieces of the Cortex Agent client: request payload,
+    SSE event handling, SQL extraction and SQL execution.
+
+    Per-call state lives on the AgentResponse built for each request, so a
+    single instance can be shared across Slack handler threads or tasks.
     """
 
     def __init__(
@@ -54,58 +89,60 @@ class CortexAgent:
         agent_url: str,
         pat: str,
         connection=None,
-        debug: bool = False
+        debug: bool = False,
+        pool_size: int = 10,
+        sql_pool=None,
+        max_result_rows: int = 10000,
+        max_result_bytes: int = 50 * 1024 * 1024,
+        result_cache=None,
+        answer_cache=None,
+        connect_timeout: float = 10,
+        read_timeout: float = 120,
+        aggregate_top_n: int = 0,
+        max_parallel_queries: int = 3
     ):
         self.agent_url = agent_url
         self.pat = pat
         self.connection = connection
+        self.sql_pool = sql_pool
+        self.max_result_rows = max_result_rows
+        self.max_result_bytes = max_result_bytes
+        self.aggregate_top_n = aggregate_top_n
+        self.max_parallel_queries = max(1, max_parallel_queries)
+        self.result_cache = result_cache
+        self.answer_cache = answer_cache
         self.debug = debug
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.headers = {
+            "X-Snowflake-Authorization-Token-Type": "PROGRAMMATIC_ACCESS_TOKEN",
+            "Authorization": f"Bearer {self.pat}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        self._event_handlers = {
+            'response.status': self._on_status_event,
+            'response.thinking.delta': self._on_thinking_delta_event,
+            'response.thinking': self._on_thinking_event,
+            'response.text.delta': self._on_text_delta_event,
+            'response.tool_result': self._on_tool_result_event,
+        }
 
-        self.planning_steps: List[str] = []
-        self.thinking_content: List[str] = []
-        self.sql_queries: List[str] = []
-        self.verified_query_used: bool = False
+        # Request payload size metrics, see stats().
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._payload_bytes_total = 0
+        self._payload_bytes_max = 0
+        self._payload_tokens_total = 0
+        self._payload_tokens_max = 0
 
-    def chat(
+    def _build_payload(
         self,
         query: str,
-        on_status: Optional[Callable[[str, List[str]], None]] = None,
         conversation_history: Optional[List[Dict[str, str]]] = None
     ) -> Dict[str, Any]:
-        """
-        Send a query to the Cortex Agent and get a response.
-
-        Args:
-            query: User's natural language question
-            on_status: Optional callback for real-time status updates
-                       Signature: on_status(status_message, all_steps)
-            conversation_history: Optional list of previous messages
-                       Format: [{"role": "user"|"assistant", "content": "..."}]
-
-        Returns:
-            Dict with response data (text, sql_queries, data, etc.)
-        """
-        self.planning_steps = []
-        self.thinking_content = []
-        self.sql_queries = []
-        self.verified_query_used = False
-
-        response = self._stream_request(query, on_status, conversation_history)
-
-        if response.sql_queries and self.connection:
-            response.data = self._execute_sql(response.sql_queries[0])
-
-        return response.to_dict()
-
-    def _stream_request(
-        self,
-        query: str,
-        on_status: Optional[Callable] = None,
-        conversation_history: Optional[List[Dict[str, str]]] = None
-    ) -> AgentResponse:
-        """Make streaming request to Cortex Agent API."""
-
-        # Build messages array with conversation history
+        """Build the agent request body with conversation history."""
         messages = []
 
         if conversation_history:
@@ -121,120 +158,235 @@ class CortexAgent:
             "content": [{"type": "text", "text": query}]
         })
 
-        payload = {
+        return {
             "messages": messages,
             "tool_choice": {"type": "auto"},
             "stream": True
         }
 
-        headers = {
-            "X-Snowflake-Authorization-Token-Type": "PROGRAMMATIC_ACCESS_TOKEN",
-            "Authorization": f"Bearer {self.pat}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
+    def _encode_payload(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        response: AgentResponse
+    ) -> bytes:
+        """Serialize the request body and record its size."""
+        body = json.dumps(self._build_payload(query, conversation_history)).encode('utf-8')
+        response.request_bytes = len(body)
+        # Same rough estimate as conversation.estimate_tokens (~4 characters per token).
+        tokens = sum(len(m["content"]) // 4 + 1 for m in conversation_history or []) + len(query) // 4 + 1
+
+        with self._stats_lock:
+            self._requests += 1
+            self._payload_bytes_total += len(body)
+            self._payload_bytes_max = max(self._payload_bytes_max, len(body))
+            self._payload_tokens_total += tokens
+            self._payload_tokens_max = max(self._payload_tokens_max, tokens)
+
+        print(f"Request payload: {len(body)} bytes, ~{tokens} tokens, {len(conversation_history or [])} history messages")
+        return body
+
+    def stats(self) -> Dict[str, float]:
+        """Request payload size metrics (bytes and estimated tokens)."""
+        with self._stats_lock:
+            return {
+                'requests': self._requests,
+                'payload_bytes_total': self._payload_bytes_total,
+                'payload_bytes_max': self._payload_bytes_max,
+                'payload_bytes_avg': self._payload_bytes_total / self._requests if self._requests else 0.0,
+                'payload_tokens_total': self._payload_tokens_total,
+                'payload_tokens_max': self._payload_tokens_max,
+                'payload_tokens_avg': self._payload_tokens_total / self._requests if self._requests else 0.0
+            }
+
+    def _handle_event(
+        self,
+        event: SSEEvent,
+        state: _StreamState,
+        response: AgentResponse,
+        callbacks: AgentCallbacks
+    ) -> bool:
+        """
+        Apply one SSE event to the response.
 
-        response = AgentResponse()
-        current_event = None
-        accumulated_text = ""
-        current_thinking = ""
+        Events are routed by type before any JSON is decoded; payloads of
+        events without a handler are never parsed.
+
+        Returns:
+            False once the stream signals [DONE], True otherwise
+        """
+        data_content = event.data
+
+        if data_content == '[DONE]':
+            return False
+
+        handler = self._event_handlers.get(event.event)
+        if handler is None and '"message.delta"' not in data_content:
+            return True
+
+        if data_content.startswith('['):
+            return True
 
         try:
-            http_response = requests.post(
-                self.agent_url,
-                headers=headers,
-                data=json.dumps(payload),
-                timeout=120,
-                stream=True
-            )
-            http_response.raise_for_status()
+            json_data = json.loads(data_content)
+        except json.JSONDecodeError:
+            return True
 
-            for line in http_response.iter_lines():
-                if not line:
-                    continue
+        if handler is not None:
+            handler(json_data, state, response, callbacks)
+        elif json_data.get('object') == 'message.delta':
+            self._process_message_delta(json_data, response, callbacks)
 
-                line_decoded = line.decode('utf-8')
+        return True
 
-                if line_decoded.startswith('event: '):
-                    current_event = line_decoded[7:].strip()
-                    continue
+    def _on_status_event(
+        self,
+        json_data: Dict,
+        state: _StreamState,
+        response: AgentResponse,
+        callbacks: AgentCallbacks
+    ):
+        """Record a planning step and notify the status callback."""
+        if 'message' in json_data:
+            status_msg = json_data['message']
+            response.planning_steps.append(status_msg)
 
-                if not line_decoded.startswith('data: '):
-                    continue
+            if callbacks.on_status:
+                callbacks.on_status(status_msg, response.planning_steps)
 
-                data_content = line_decoded[6:].strip()
+            if self.debug:
+                print(f"Status: {status_msg}")
 
-                if data_content == '[DONE]':
-                    break
+    def _on_thinking_delta_event(
+        self,
+        json_data: Dict,
+        state: _StreamState,
+        response: AgentResponse,
+        callbacks: AgentCallbacks
+    ):
+        """Collect a streamed thinking fragment."""
+        if 'text' in json_data:
+            text = json_data['text']
+            text = text.replace('<thinking>', '').replace('</thinking>', '')
+            state.thinking.append(text)
 
-                if data_content.startswith('['):
-                    continue
+            if callbacks.on_thinking_delta:
+                callbacks.on_thinking_delta(text)
 
-                try:
-                    json_data = json.loads(data_content)
-                except json.JSONDecodeError:
-                    continue
+    def _on_thinking_event(
+        self,
+        json_data: Dict,
+        state: _StreamState,
+        response: AgentResponse,
+        callbacks: AgentCallbacks
+    ):
+        """Finalize a thinking block from the full event and buffered deltas."""
+        if 'text' in json_data:
+            text = json_data['text']
+            match = re.search(r'<thinking>(.*?)</thinking>', text, re.DOTALL)
+            if match:
+                thinking = match.group(1).strip()
+                if thinking:
+                    response.thinking_content.append(thinking)
+
+        current_thinking = ''.join(state.thinking).strip()
+        if current_thinking:
+            response.thinking_content.append(current_thinking)
+        state.thinking.clear()
+
+    def _on_text_delta_event(
+        self,
+        json_data: Dict,
+        state: _StreamState,
+        response: AgentResponse,
+        callbacks: AgentCallbacks
+    ):
+        """Collect a streamed answer text fragment."""
+        if 'text' in json_data:
+            state.text.append(json_data['text'])
 
-                if current_event == 'response.status':
-                    if 'message' in json_data:
-                        status_msg = json_data['message']
-                        self.planning_steps.append(status_msg)
-                        response.planning_steps.append(status_msg)
+            if callbacks.on_text_delta:
+                callbacks.on_text_delta(json_data['text'])
 
-                        if on_status:
-                            on_status(status_msg, self.planning_steps)
+    def _on_tool_result_event(
+        self,
+        json_data: Dict,
+        state: _StreamState,
+        response: AgentResponse,
+        callbacks: AgentCallbacks
+    ):
+        """Extract SQL and verification info from a tool result."""
+        self._process_tool_result(json_data, response, callbacks)
 
-                        if self.debug:
-                            print(f"Status: {status_msg}")
+        if callbacks.on_tool_result:
+            callbacks.on_tool_result(json_data)
 
-                elif current_event == 'response.thinking.delta':
-                    if 'text' in json_data:
-                        text = json_data['text']
-                        text = text.replace('<thinking>', '').replace('</thinking>', '')
-                        current_thinking += text
+    def _resolve_callbacks(
+        self,
+        on_status: Optional[Callable],
+        callbacks: Optional[AgentCallbacks]
+    ) -> AgentCallbacks:
+        """Merge the legacy on_status argument into a callbacks object."""
+        if callbacks is None:
+            return AgentCallbacks(on_status=on_status)
+        if on_status and not callbacks.on_status:
+            return replace(callbacks, on_status=on_status)
+        return callbacks
+
+    def _cached_answer(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]]
+    ) -> Optional[AgentResponse]:
+        """Serve a repeated first-turn question from the answer cache."""
+        if self.answer_cache is None or conversation_history:
+            return None
 
-                elif current_event == 'response.thinking':
-                    if 'text' in json_data:
-                        text = json_data['text']
-                        match = re.search(r'<thinking>(.*?)</thinking>', text, re.DOTALL)
-                        if match:
-                            thinking = match.group(1).strip()
-                            if thinking:
-                                self.thinking_content.append(thinking)
-                                response.thinking_content.append(thinking)
+        response = self.answer_cache.get(query)
+        if response is not None and self.debug:
+            print(f"Answer cache hit: {query}")
+        return response
 
-                    if current_thinking.strip():
-                        self.thinking_content.append(current_thinking.strip())
-                        response.thinking_content.append(current_thinking.strip())
-                        current_thinking = ""
+    def _remember_answer(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        response: AgentResponse
+    ):
+        """Store a first-turn answer, including its data, in the answer cache."""
+        if self.answer_cache is not None and not conversation_history:
+            self.answer_cache.put(query, response)
 
-                elif current_event == 'response.text.delta':
-                    if 'text' in json_data:
-                        accumulated_text += json_data['text']
+    def _chain_on_sql(self, callbacks: AgentCallbacks, start_sql: Callable[[str], None]) -> AgentCallbacks:
+        """Return callbacks that start SQL execution before any subscriber's on_sql."""
+        subscriber = callbacks.on_sql
 
-                elif current_event == 'response.tool_result':
-                    self._process_tool_result(json_data, response)
+        def on_sql(sql: str):
+            start_sql(sql)
+            if subscriber:
+                return subscriber(sql)
 
-                elif json_data.get('object') == 'message.delta':
-                    self._process_message_delta(json_data, response)
+        return replace(callbacks, on_sql=on_sql)
 
-            response.text = accumulated_text.strip()
-            response.sql_queries = self.sql_queries
-            response.verified_query_used = self.verified_query_used
+    def _set_datasets(self, response: AgentResponse, datasets: List[Optional[pd.DataFrame]]):
+        """Attach per-query results; data stays the first result for single-chart callers."""
+        response.datasets = datasets
+        response.data = next((df for df in datasets if df is not None), None)
 
-            return response
+    def _add_sql(self, sql: str, response: AgentResponse, callbacks: Optional[AgentCallbacks]):
+        """Record a newly extracted SQL query and notify subscribers."""
+        if sql and sql not in response.sql_queries:
+            response.sql_queries.append(sql)
 
-        except requests.exceptions.Timeout:
-            response.text = "Request timed out. Please try again."
-            return response
-        except requests.exceptions.RequestException as e:
-            response.text = f"Request failed: {str(e)}"
-            return response
-        except Exception as e:
-            response.text = f"Unexpected error: {str(e)}"
-            return response
+            if callbacks and callbacks.on_sql:
+                callbacks.on_sql(sql)
 
-    def _process_tool_result(self, json_data: Dict, response: AgentResponse):
+    def _process_tool_result(
+        self,
+        json_data: Dict,
+        response: AgentResponse,
+        callbacks: Optional[AgentCallbacks] = None
+    ):
         """Process tool result events to extract SQL and verification info."""
         content = json_data.get('content', [])
 
@@ -246,21 +398,24 @@ class CortexAgent:
                 json_content = item['json']
 
                 if 'sql' in json_content:
-                    sql = json_content['sql']
-                    if sql and sql not in self.sql_queries:
-                        self.sql_queries.append(sql)
+                    self._add_sql(json_content['sql'], response, callbacks)
 
                 if json_content.get('verified_query_used'):
-                    self.verified_query_used = True
+                    response.verified_query_used = True
                 if json_content.get('query_verified'):
-                    self.verified_query_used = True
+                    response.verified_query_used = True
 
             if 'text' in item:
                 text = item['text']
                 if 'verified' in text.lower():
-                    self.verified_query_used = True
+                    response.verified_query_used = True
 
-    def _process_message_delta(self, json_data: Dict, response: AgentResponse):
+    def _process_message_delta(
+        self,
+        json_data: Dict,
+        response: AgentResponse,
+        callbacks: Optional[AgentCallbacks] = None
+    ):
         """Process message delta events."""
         delta = json_data.get('delta', {})
         content = delta.get('content', [])
@@ -272,13 +427,15 @@ class CortexAgent:
                     if 'json' in result_item:
                         json_content = result_item['json']
                         if 'sql' in json_content:
-                            sql = json_content['sql']
-                            if sql and sql not in self.sql_queries:
-                                self.sql_queries.append(sql)
+                            self._add_sql(json_content['sql'], response, callbacks)
+
+    def _can_execute_sql(self) -> bool:
+        """True if a connection or connection pool is available for SQL."""
+        return self.sql_pool is not None or self.connection is not None
 
     def _execute_sql(self, sql: str) -> Optional[pd.DataFrame]:
         """Execute SQL query and return results as DataFrame."""
-        if not self.connection:
+        if not self._can_execute_sql():
             return None
 
         try:
@@ -286,22 +443,340 @@ class CortexAgent:
             if sql.endswith(';'):
                 sql = sql[:-1]
 
-            cursor = self.connection.cursor()
-            cursor.execute(sql)
+            if self.result_cache is not None:
+                cached = self.result_cache.get(sql)
+                if cached is not None:
+                    return cached
 
-            columns = [desc[0] for desc in cursor.description] if cursor.description else []
-            rows = cursor.fetchall()
-            cursor.close()
+            if self.sql_pool is not None:
+                data = self.sql_pool.run(lambda conn: self._fetch_dataframe(conn, sql))
+            else:
+                data = self._fetch_dataframe(self.connection, sql)
 
-            if rows and columns:
-                return pd.DataFrame(rows, columns=columns)
-            return None
+            if self.result_cache is not None:
+                self.result_cache.put(sql, data)
+            return data
 
         except Exception as e:
             if self.debug:
                 print(f"SQL execution error: {e}")
             return None
 
+    def _fetch_dataframe(self, connection, sql: str) -> Optional[pd.DataFrame]:
+        """Run SQL on a connection and build a DataFrame from the result."""
+        cursor = connection.cursor()
+        try:
+            # One row past the cap is enough to tell the result was truncated.
+            cursor.execute(limit_sql(sql, self.max_result_rows + 1))
+
+            try:
+                batches = cursor.fetch_pandas_batches()
+            except Exception:
+                # Raised before any data is read for non-Arrow result formats
+                # (SHOW, DESCRIBE, ...) or when pyarrow is unavailable.
+                return self._fetch_rows(cursor)
+
+            data = self._collect_batches(batches)
+            if data is not None and data.attrs.get('truncated') and self.aggregate_top_n:
+                data = self._aggregate_truncated(cursor, sql, data)
+            return data
+        finally:
+            cursor.close()
+
+    def _aggregate_truncated(self, cursor, sql: str, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Replace a truncated label/value result with a top-N + "Other"
+        aggregate computed in Snowflake, so the chart covers every row.
+
+        Results without a text and a numeric column are returned as-is, as
+        are time series, which charts downsample along the time axis instead
+        of ranking dates.
+        """
+        profile = profile_data(data)
+        if profile.time_column() is not None or not profile.text:
+            return data
+
+        label = profile.text[0]
+        value = profile.value_column(exclude=label)
+        if value is None:
+            return data
+
+        try:
+            cursor.execute(top_n_sql(sql, label, value, self.aggregate_top_n))
+            aggregated = self._collect_batches(cursor.fetch_pandas_batches())
+        except Exception as e:
+            if self.debug:
+                print(f"Top-N aggregation failed: {e}")
+            return data
+
+        if aggregated is None:
+            return data
+        aggregated.attrs['aggregated'] = True
+        return aggregated
+
+    def _collect_batches(self, batches) -> Optional[pd.DataFrame]:
+        """
+        Concatenate Arrow-backed DataFrame batches, stopping at the row/byte cap.
+
+        A result cut short by the cap has data.attrs['truncated'] set.
+        """
+        frames = []
+        rows = 0
+        nbytes = 0
+        truncated = False
+
+        for batch in batches:
+            frames.append(batch)
+            rows += len(batch)
+            nbytes += int(batch.memory_usage(index=False).sum())
+
+            # Queries are limited to max_result_rows + 1, so only the extra row marks truncation.
+            if rows > self.max_result_rows or nbytes >= self.max_result_bytes:
+                truncated = True
+                break
+
+        if not frames:
+            return None
+
+        data = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        if len(data) > self.max_result_rows:
+            data = data.iloc[:self.max_result_rows]
+
+        if data.empty or len(data.columns) == 0:
+            return None
+
+        data.attrs['truncated'] = truncated
+        return data
+
+    def _fetch_rows(self, cursor) -> Optional[pd.DataFrame]:
+        """Row-based fallback for results that cannot be fetched as Arrow."""
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        rows = cursor.fetchmany(self.max_result_rows)
+
+        if rows and columns:
+            return pd.DataFrame(rows, columns=columns)
+        return None
+
+
+def _iter_stream(http_response, chunk_size: int = 8192):
+    """
+    Yield body bytes as soon as they arrive. iter_content() fills whole
+    chunks, and without chunked transfer encoding chunk_size=None reads the
+    entire body first, so events would only be parsed at the end.
+    """
+    read1 = getattr(http_response.raw, 'read1', None)
+    if read1 is None:
+        # urllib3 1.x has no read1; small chunks keep parsing close to live.
+        yield from http_response.iter_content(chunk_size=1024)
+        return
+
+    while True:
+        chunk = read1(chunk_size, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+class _SQLBatch:
+    """
+    The SQL queries of one response, run on a shared executor with at most
+    `limit` in flight so a multi-part answer cannot take over the pool.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, execute: Callable[[str], Optional[pd.DataFrame]], limit: int):
+        self.executor = executor
+        self.execute = execute
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._pending: "deque[str]" = deque()
+        self._futures: Dict[str, Future] = {}
+        self._running = 0
+
+    def add(self, sql: str):
+        """Queue a query (once) and start it if a slot is free."""
+        with self._lock:
+            if sql in self._futures:
+                return
+            self._futures[sql] = Future()
+            self._pending.append(sql)
+        self._dispatch()
+
+    def results(self) -> Dict[str, Optional[pd.DataFrame]]:
+        """Wait for every queued query; failed queries map to None."""
+        with self._lock:
+            futures = dict(self._futures)
+        return {sql: future.result() for sql, future in futures.items()}
+
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if self._running >= self.limit or not self._pending:
+                    return
+                sql = self._pending.popleft()
+                self._running += 1
+            try:
+                future = self.executor.submit(self.execute, sql)
+            except RuntimeError as e:
+                # The executor is shutting down; report the query as failed.
+                future = Future()
+                future.set_exception(e)
+            future.add_done_callback(lambda done, sql=sql: self._finish(sql, done))
+
+    def _finish(self, sql: str, done: Future):
+        with self._lock:
+            self._running -= 1
+        try:
+            result = done.result()
+        except (Exception, CancelledError) as e:
+            print(f"SQL execution failed: {e}")
+            result = None
+        self._futures[sql].set_result(result)
+        self._dispatch()
+
+
+class CortexAgent(BaseCortexAgent):
+    """
+    Cortex Agent API client with streaming support.
+
+    Usage:
+        agent = CortexAgent(agent_url, pat)
+        response = agent.chat("How many tickets by service type?")
+        print(response['text'])
+        print(response['data'])
+    """
+
+    def __init__(self, agent_url: str, pat: str, sql_workers: int = 4, **kwargs):
+        super().__init__(agent_url, pat, **kwargs)
+        self.timeout = (self.connect_timeout, self.read_timeout)
+
+        # SQL starts on a worker as soon as the tool result names it, so the
+        # warehouse round-trip overlaps the rest of the answer stream.
+        self.sql_executor = ThreadPoolExecutor(max_workers=sql_workers, thread_name_prefix="cortex-sql")
+
+        # One keep-alive session per agent so every chat reuses pooled
+        # connections instead of paying DNS + TCP + TLS on each question.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+
+    def close(self):
+        """Close pooled HTTP connections and the SQL worker pool."""
+        self.session.close()
+        self.sql_executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def chat(
+        self,
+        query: str,
+        on_status: Optional[Callable[[str, List[str]], None]] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        callbacks: Optional[AgentCallbacks] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a query to the Cortex Agent and get a response.
+
+        Args:
+            query: User's natural language question
+            on_status: Optional callback for real-time status updates
+                       Signature: on_status(status_message, all_steps)
+            conversation_history: Optional list of previous messages
+                       Format: [{"role": "user"|"assistant", "content": "..."}]
+            callbacks: Optional AgentCallbacks for text, thinking, tool result,
+                       SQL and completion events as they stream in
+
+        Returns:
+            Dict with response data (text, sql_queries, data, datasets, etc.)
+        """
+        callbacks = self._resolve_callbacks(on_status, callbacks)
+
+        cached = self._cached_answer(query, conversation_history)
+        if cached is not None:
+            if callbacks.on_done:
+                callbacks.on_done(cached)
+            return cached.to_dict()
+
+        batch = _SQLBatch(self.sql_executor, self._execute_sql, self.max_parallel_queries)
+
+        def start_sql(sql: str):
+            if self._can_execute_sql():
+                batch.add(sql)
+
+        response = self._stream_request(
+            query,
+            self._chain_on_sql(callbacks, start_sql),
+            conversation_history
+        )
+
+        if response.sql_queries and self._can_execute_sql():
+            # Queries parsed from the final text never reached on_sql.
+            for sql in response.sql_queries:
+                batch.add(sql)
+            results = batch.results()
+            self._set_datasets(response, [results.get(sql) for sql in response.sql_queries])
+
+        self._remember_answer(query, conversation_history, response)
+
+        return response.to_dict()
+
+    def _stream_request(
+        self,
+        query: str,
+        callbacks: AgentCallbacks,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> AgentResponse:
+        """Make streaming request to Cortex Agent API."""
+        response = AgentResponse()
+        body = self._encode_payload(query, conversation_history, response)
+
+        state = _StreamState()
+        parser = SSEParser()
+
+        try:
+            http_response = self.session.post(
+                self.agent_url,
+                data=body,
+                timeout=self.timeout,
+                stream=True
+            )
+
+            with http_response:
+                if not http_response.ok:
+                    # Read the short error body first; a response closed
+                    # mid-body takes its keep-alive connection with it.
+                    http_response.content
+                    http_response.raise_for_status()
+
+                stream = _iter_stream(http_response)
+                for chunk in stream:
+                    if not all(self._handle_event(event, state, response, callbacks) for event in parser.feed(chunk)):
+                        break
+
+                # Anything after [DONE] is read and dropped so the connection
+                # goes back to the pool.
+                for _ in stream:
+                    pass
+
+            response.text = ''.join(state.text).strip()
+
+        except requests.exceptions.Timeout:
+            response.text = response.error = "Request timed out. Please try again."
+        except requests.exceptions.RequestException as e:
+            response.text = response.error = f"Request failed: {str(e)}"
+        except Exception as e:
+            response.text = response.error = f"Unexpected error: {str(e)}"
+
+        if callbacks.on_done:
+            callbacks.on_done(response)
+
+        return response
+
 
 class SimpleResponseParser:
     """Simple parser for extracting key info from Cortex responses."""
@@ -0,0 +1,156 @@
+"""
+Result Profiling
+One-pass summary of a query result (column kinds, cardinality, nulls and
+sort order) shared by chart selection and the agent's SQL pushdown. Depends
+only on pandas, so the agent client does not pull in matplotlib.
+"""
+
+import re
+import datetime
+import warnings
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Column-name fragments that mark a time axis when no column holds real dates.
+DATE_NAME_HINTS = ['date', 'month', 'year', 'time', 'day']
+
+# Text that looks like an ISO or US date/timestamp is worth parsing.
+_DATE_TEXT = re.compile(r'^(\d{4}-\d{1,2}(-\d{1,2})?([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?|\d{1,2}/\d{1,2}/\d{2,4})$')
+
+
+@dataclass
+class ColumnProfile:
+    """Summary of one result column."""
+    name: str
+    kind: str  # 'numeric', 'datetime', 'text' or 'other'
+    cardinality: int
+    null_ratio: float
+    monotonic: bool
+
+
+@dataclass
+class DataProfile:
+    """
+    One-pass summary of a result set that chart selection and drawing read
+    instead of re-inspecting the DataFrame.
+    
+    Usage:
+        profile = profile_data(df)
+        profile.time_column(), profile.numeric, profile.columns['DAY'].cardinality
+    """
+    rows: int
+    columns: Dict[str, ColumnProfile] = field(default_factory=dict)
+    
+    def _of_kind(self, kind: str) -> List[str]:
+        return [name for name, column in self.columns.items() if column.kind == kind]
+    
+    @property
+    def numeric(self) -> List[str]:
+        return self._of_kind('numeric')
+    
+    @property
+    def dates(self) -> List[str]:
+        return self._of_kind('datetime')
+    
+    @property
+    def text(self) -> List[str]:
+        return self._of_kind('text')
+    
+    def time_column(self) -> Optional[str]:
+        """The column to plot along a time axis: real dates first, then a date-like name."""
+        if self.dates:
+            return self.dates[0]
+        for name, column in self.columns.items():
+            if column.kind in ('text', 'numeric') and any(hint in str(name).lower() for hint in DATE_NAME_HINTS):
+                return name
+        return None
+    
+    def label_column(self) -> Optional[str]:
+        """The column naming bars or wedges: text first, then dates."""
+        labels = self.text or self.dates
+        return labels[0] if labels else None
+    
+    def value_column(self, exclude: Optional[str] = None) -> Optional[str]:
+        """The first numeric column other than exclude."""
+        return next((name for name in self.numeric if name != exclude), None)
+
+
+def _parse_dates(values: pd.Series) -> Optional[pd.Series]:
+    """Parse a text/object column as datetimes, or None if it does not hold dates."""
+    present = values.dropna()
+    if present.empty:
+        return None
+    
+    # Snowflake DATE columns arrive as datetime.date objects; text must look like a date.
+    first = present.iloc[0]
+    if not isinstance(first, (datetime.date, pd.Timestamp)):
+        if not isinstance(first, str) or not _DATE_TEXT.match(first.strip()):
+            return None
+    
+    with warnings.catch_warnings():
+        # Quiet pandas' format-inference fallback warning.
+        warnings.simplefilter('ignore')
+        parsed = pd.to_datetime(values, errors='coerce')
+    
+    if parsed.notna().sum() < 0.9 * len(present):
+        return None
+    return parsed
+
+
+def _nunique(values: pd.Series, default: int) -> int:
+    try:
+        return values.nunique(dropna=True)
+    except TypeError:
+        return default
+
+
+def profile_data(data: pd.DataFrame) -> DataProfile:
+    """
+    Profile a result set: each column's kind, cardinality, null ratio and
+    whether it is sorted. Date detection covers datetime dtypes, date objects
+    and date-formatted text, not just column names.
+    """
+    rows = len(data)
+    null_ratio = data.isna().mean() if rows else pd.Series(0.0, index=data.columns)
+    try:
+        cardinality = data.nunique(dropna=True)
+    except TypeError:
+        # A column of unhashable cells (lists, dicts) counts as all distinct.
+        cardinality = pd.Series({name: _nunique(data[name], rows) for name in data.columns})
+    
+    numeric = set(data.select_dtypes(include=['number']).columns)
+    dates = set(data.select_dtypes(include=['datetime', 'datetimetz']).columns)
+    text = set(data.select_dtypes(include=['object', 'string', 'category']).columns)
+    
+    profile = DataProfile(rows=rows)
+    for name in data.columns:
+        values = data[name]
+        if name in numeric:
+            kind = 'numeric'
+        elif name in dates:
+            kind = 'datetime'
+        elif name in text:
+            parsed = _parse_dates(values) if not isinstance(values.dtype, pd.CategoricalDtype) else None
+            if parsed is not None:
+                kind, values = 'datetime', parsed
+            else:
+                kind = 'text'
+        else:
+            kind = 'other'
+        
+        try:
+            monotonic = values.is_monotonic_increasing or values.is_monotonic_decreasing
+        except TypeError:
+            monotonic = False
+        
+        profile.columns[name] = ColumnProfile(
+            name=name,
+            kind=kind,
+            cardinality=int(cardinality[name]),
+            null_ratio=float(null_ratio[name]),
+            monotonic=bool(monotonic)
+        )
+    
+    return profile
@@ -0,0 +1,271 @@
+"""
+SQL Result Cache
+In-process cache of query results keyed by normalized SQL text plus the
+role/warehouse context, with TTL, memory-bounded LRU eviction and an optional
+on-disk Parquet tier that survives restarts.
+
+Cached DataFrames are never handed out directly: put() stores a copy and
+get() returns one, so callers may modify their result freely.
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from config import (
+    ROLE, WAREHOUSE, RESULT_CACHE_TTL, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_DIR,
+    RESULT_CACHE_DISK_MAX_BYTES
+)
+
+# The disk tier is swept for expired and over-budget files at most this often.
+DISK_SWEEP_INTERVAL = 60
+
+# Quoted strings and identifiers are kept verbatim; everything else is
+# whitespace-collapsed and upper-cased (unquoted identifiers and keywords are
+# case-insensitive in Snowflake).
+_SQL_TOKEN_PATTERN = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"]|\"\")*\")")
+
+
+def normalize_sql(sql: str) -> str:
+    """Canonical form of a SQL statement for cache lookups."""
+    parts = _SQL_TOKEN_PATTERN.split(sql.strip().rstrip(';').strip())
+    normalized = []
+    for i, part in enumerate(parts):
+        if i % 2:
+            normalized.append(part)
+        else:
+            normalized.append(re.sub(r'\s+', ' ', part).upper())
+    return ''.join(normalized).strip()
+
+
+class ResultCache:
+    """
+    TTL + LRU cache of SQL result DataFrames.
+
+    Usage:
+        cache = ResultCache(namespace="ROLE:WAREHOUSE", ttl_seconds=300)
+        data = cache.get(sql)
+        if data is None:
+            data = run(sql)
+            cache.put(sql, data)
+    """
+
+    def __init__(
+        self,
+        namespace: str = "",
+        ttl_seconds: float = 300,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_entries: int = 1000,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 1024 * 1024 * 1024
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._next_disk_sweep = 0.0
+
+        self._entries: "OrderedDict[str, Tuple[pd.DataFrame, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def key(self, sql: str) -> str:
+        """Cache key for a SQL statement in this cache's role/warehouse namespace."""
+        digest = hashlib.sha256(f"{self.namespace}\n{normalize_sql(sql)}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, sql: str) -> Optional[pd.DataFrame]:
+        """Return the cached result for sql, or None on a miss or expiry."""
+        key = self.key(sql)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                data, stored_at, size = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return data.copy()
+                self._remove_locked(key)
+
+        data, stored_at = self._read_disk(key, now)
+
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+
+        self._store(key, data, stored_at)
+        return data.copy()
+
+    def put(self, sql: str, data: Optional[pd.DataFrame]):
+        """Cache a result; None results are not cached."""
+        if data is None:
+            return
+
+        key = self.key(sql)
+        now = time.time()
+        self._store(key, data.copy(), now)
+        self._write_disk(key, data)
+        self._maybe_sweep_disk(now)
+
+    def clear(self):
+        """Drop all in-memory entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current memory use."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+    def _store(self, key: str, data: pd.DataFrame, stored_at: float):
+        """Insert into the memory tier and evict least-recently-used entries."""
+        size = int(data.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove_locked(key)
+
+            self._entries[key] = (data, stored_at, size)
+            self._bytes += size
+
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                oldest = next(iter(self._entries))
+                self._remove_locked(oldest)
+                self.evictions += 1
+
+    def _remove_locked(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.parquet")
+
+    def _read_disk(self, key: str, now: float) -> Tuple[Optional[pd.DataFrame], float]:
+        """Load an unexpired Parquet entry and its write time, if the disk tier is enabled."""
+        if not self.disk_dir:
+            return None, 0.0
+
+        path = self._disk_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if now - stored_at > self.ttl_seconds:
+                os.remove(path)
+                return None, 0.0
+            return pd.read_parquet(path), stored_at
+        except FileNotFoundError:
+            return None, 0.0
+        except Exception as e:
+            print(f"Result cache read failed: {e}")
+            return None, 0.0
+
+    def _write_disk(self, key: str, data: pd.DataFrame):
+        """Persist an entry to the Parquet tier via an atomic rename."""
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            data.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Result cache write failed: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _maybe_sweep_disk(self, now: float):
+        """Run sweep_disk if the disk tier is enabled and the last sweep is old enough."""
+        if not self.disk_dir:
+            return
+        with self._lock:
+            if now < self._next_disk_sweep:
+                return
+            self._next_disk_sweep = now + min(DISK_SWEEP_INTERVAL, self.ttl_seconds)
+        self.sweep_disk(now)
+
+    def sweep_disk(self, now: Optional[float] = None) -> int:
+        """
+        Delete expired Parquet files, then the oldest ones until the
+        directory fits in disk_max_bytes.
+
+        Returns:
+            Number of files removed
+        """
+        if not self.disk_dir:
+            return 0
+        now = time.time() if now is None else now
+
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                for entry in entries:
+                    # Leftover temp files from interrupted writes expire too.
+                    if entry.is_file() and entry.name.endswith(('.parquet', '.tmp')):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            print(f"Result cache sweep failed: {e}")
+            return 0
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            if now - mtime <= self.ttl_seconds and total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Result cache sweep failed: {e}")
+                continue
+            total -= size
+        return removed
+
+
+def create_result_cache() -> Optional[ResultCache]:
+    """Create the shared result cache from configuration (None when disabled)."""
+    if RESULT_CACHE_TTL <= 0:
+        return None
+
+    return ResultCache(
+        namespace=f"{ROLE}:{WAREHOUSE}".upper(),
+        ttl_seconds=RESULT_CACHE_TTL,
+        max_bytes=RESULT_CACHE_MAX_BYTES,
+        disk_dir=RESULT_CACHE_DIR,
+        disk_max_bytes=RESULT_CACHE_DISK_MAX_BYTES
+    )
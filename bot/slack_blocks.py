@@ -0,0 +1,201 @@
+"""
+Slack Block Kit builders shared by the sync and async Slack front ends.
+"""
+
+import re
+import json
+from typing import List
+
+# Slack rejects section text over 3000 characters; leave room for headers.
+SECTION_TEXT_LIMIT = 2900
+
+
+def format_for_slack(text: str) -> str:
+    """Convert markdown to Slack mrkdwn format."""
+    if not text:
+        return text
+    text = re.sub(r'\*\*(.*?)\*\*', r'*\1*', text)
+    text = re.sub(r'__(.*?)__', r'*\1*', text)
+    return text
+
+
+def create_thinking_block(status: str, steps: list = None, is_complete: bool = False) -> list:
+    """Create Slack blocks for thinking/reasoning display."""
+    if is_complete:
+        step_count = len(steps) if steps else 0
+        header = f"*Thinking...* Complete ({step_count} steps)"
+    else:
+        header = f"*Thinking...* {status}"
+
+    blocks = [
+        {
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": header}
+        }
+    ]
+
+    if is_complete and steps:
+        blocks.append({
+            "type": "actions",
+            "elements": [{
+                "type": "button",
+                "text": {"type": "plain_text", "text": "Show Details"},
+                "action_id": "show_thinking_details",
+                "value": json.dumps({"steps": steps[-20:]})
+            }]
+        })
+
+    return blocks
+
+
+def split_for_slack(text: str, limit: int = SECTION_TEXT_LIMIT) -> List[str]:
+    """
+    Split text into chunks of at most limit characters.
+
+    Cuts prefer line breaks, then spaces. Each chunk depends only on the text
+    before it, so re-splitting a growing stream never changes earlier chunks.
+    """
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit)
+        if cut < limit // 2:
+            cut = text.rfind(' ', 0, limit)
+        if cut < limit // 2:
+            cut = limit
+        chunks.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def create_text_blocks(chunk: str, is_first: bool = True, is_complete: bool = True) -> list:
+    """Create Slack blocks for one (possibly partial) chunk of response text."""
+    header = "*Response:*\n" if is_first else ""
+    blocks = [{
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": f"{header}{chunk}"}
+    }]
+
+    if not is_complete:
+        blocks.append({
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": "_Writing..._"}]
+        })
+
+    return blocks
+
+
+def create_response_blocks(response: dict) -> list:
+    """Create Slack blocks for the agent response."""
+    blocks = []
+
+    if response.get('text'):
+        formatted_text = format_for_slack(response['text'])
+
+        if len(formatted_text) > SECTION_TEXT_LIMIT:
+            formatted_text = formatted_text[:SECTION_TEXT_LIMIT] + "..."
+
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*Response:*\n{formatted_text}"
+            }
+        })
+
+    if response.get('verified_query_used'):
+        blocks.append({
+            "type": "context",
+            "elements": [{
+                "type": "mrkdwn",
+                "text": "*Verified Query* - Answer accuracy verified by agent owner"
+            }]
+        })
+
+    if response.get('citations'):
+        citations_text = format_for_slack(response['citations'])
+        if len(citations_text) > 500:
+            citations_text = citations_text[:500] + "..."
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*Sources:*\n_{citations_text}_"
+            }
+        })
+
+    if response.get('suggestions'):
+        suggestions = response['suggestions'][:3]
+        suggestions_text = "\n".join(f"- {s}" for s in suggestions)
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*Try asking:*\n{suggestions_text}"
+            }
+        })
+
+    return blocks
+
+
+WELCOME_BLOCKS = [
+    {
+        "type": "header",
+        "text": {"type": "plain_text", "text": "Snowflake Cortex Agent"}
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "I can help you analyze support tickets and search company documents.\n\n*Try asking:*\n- _How many tickets by service type?_\n- _What are the payment terms for Snowtires?_\n- _Show contact preference breakdown_"
+        }
+    }
+]
+
+PROCESSING_BLOCKS = [
+    {"type": "divider"},
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "*Snowflake Cortex Agent* is processing your request..."
+        }
+    }
+]
+
+
+def create_thinking_details_blocks(steps: list) -> list:
+    """Create Slack blocks for the expanded thinking steps view."""
+    steps_text = "\n".join(f"- {step}" for step in steps)
+    if len(steps_text) > 2800:
+        steps_text = steps_text[:2800] + "\n_...truncated_"
+
+    return [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*Thinking Steps:*\n{steps_text}"
+            }
+        },
+        {
+            "type": "actions",
+            "elements": [{
+                "type": "button",
+                "text": {"type": "plain_text", "text": "Hide Details"},
+                "action_id": "hide_thinking_details",
+                "value": json.dumps({"steps": steps})
+            }]
+        }
+    ]
+
+
+def create_chart_image_blocks(file_id: str, title: str) -> list:
+    """Create Slack blocks that show an already-uploaded chart image."""
+    return [{
+        "type": "image",
+        "slack_file": {"id": file_id},
+        "alt_text": title,
+        "title": {"type": "plain_text", "text": title}
+    }]
@@ -0,0 +1,398 @@
+"""
+Slack Message Updaters
+Coalescing, rate-limited chat_update senders. Callers post the latest content
+for a message and return immediately; a background thread (or asyncio task)
+sends only the newest pending content at most once per min_interval and backs
+off on HTTP 429 using Slack's Retry-After header.
+
+ResponseStreamer applies the same scheme to the answer itself, growing it
+across as many continuation messages as the section size limit requires.
+"""
+
+import time
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from slack_blocks import format_for_slack, split_for_slack, create_text_blocks, create_response_blocks
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait if the error is a Slack 429 rate limit, else None."""
+    response = getattr(error, 'response', None)
+    if response is None or getattr(response, 'status_code', None) != 429:
+        return None
+
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After') or headers.get('retry-after')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class MessageUpdater:
+    """
+    Background, coalescing chat_update sender for one Slack message.
+
+    Usage:
+        updater = MessageUpdater(client, channel, ts, min_interval=1.0)
+        updater.update(text="Thinking... step 1", blocks=...)
+        updater.finish(text="Thinking complete", blocks=...)
+    """
+
+    def __init__(self, client, channel: str, ts: str, min_interval: float = 1.0):
+        self.client = client
+        self.channel = channel
+        self.ts = ts
+        self.min_interval = min_interval
+
+        self._pending: Optional[Dict[str, Any]] = None
+        self._closed = False
+        self._next_send = 0.0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"slack-update-{ts}")
+        self._thread.start()
+
+    def update(self, **kwargs):
+        """Replace the pending content; never blocks on the Slack API."""
+        with self._cond:
+            if self._closed:
+                return
+            self._pending = kwargs
+            self._cond.notify()
+
+    def finish(self, timeout: float = 10, **kwargs):
+        """Queue a final update (if given), flush it, and stop the worker."""
+        with self._cond:
+            if kwargs:
+                self._pending = kwargs
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+
+                delay = self._next_send - time.monotonic()
+                if delay > 0:
+                    # Newer content may replace the pending update meanwhile.
+                    self._cond.wait(delay)
+                    continue
+
+                payload = self._pending
+                self._pending = None
+
+            self._send(payload)
+
+    def _send(self, payload: Dict[str, Any]):
+        try:
+            self.client.chat_update(channel=self.channel, ts=self.ts, **payload)
+            self._next_send = time.monotonic() + self.min_interval
+        except Exception as e:
+            retry_after = _retry_after(e)
+            if retry_after is None:
+                print(f"Status update failed: {e}")
+                return
+
+            self._next_send = time.monotonic() + retry_after
+            with self._cond:
+                if self._pending is None:
+                    self._pending = payload
+
+
+class AsyncMessageUpdater:
+    """
+    asyncio counterpart of MessageUpdater for AsyncWebClient.
+
+    Usage:
+        updater = AsyncMessageUpdater(client, channel, ts, min_interval=1.0)
+        updater.update(text="Thinking... step 1", blocks=...)
+        await updater.finish(text="Thinking complete", blocks=...)
+    """
+
+    def __init__(self, client, channel: str, ts: str, min_interval: float = 1.0):
+        self.client = client
+        self.channel = channel
+        self.ts = ts
+        self.min_interval = min_interval
+
+        self._pending: Optional[Dict[str, Any]] = None
+        self._closed = False
+        self._next_send = 0.0
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def update(self, **kwargs):
+        """Replace the pending content; never awaits the Slack API."""
+        if self._closed:
+            return
+        self._pending = kwargs
+        self._wakeup.set()
+
+    async def finish(self, timeout: float = 10, **kwargs):
+        """Queue a final update (if given), flush it, and stop the worker."""
+        if kwargs:
+            self._pending = kwargs
+        self._closed = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            while self._pending is None and not self._closed:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            if self._pending is None:
+                return
+
+            delay = self._next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            payload = self._pending
+            self._pending = None
+            await self._send(payload, loop)
+
+    async def _send(self, payload: Dict[str, Any], loop):
+        try:
+            await self.client.chat_update(channel=self.channel, ts=self.ts, **payload)
+            self._next_send = loop.time() + self.min_interval
+        except Exception as e:
+            retry_after = _retry_after(e)
+            if retry_after is None:
+                print(f"Status update failed: {e}")
+                return
+
+            self._next_send = loop.time() + retry_after
+            if self._pending is None:
+                self._pending = payload
+
+
+class _ResponseRenderer:
+    """Message layout shared by the sync and async response streamers."""
+
+    def __init__(self, client, channel: str, min_interval: float = 1.0):
+        self.client = client
+        self.channel = channel
+        self.min_interval = min_interval
+
+        self._parts: List[str] = []
+        self._extra_blocks: list = []
+        self._complete = False
+        self._closed = False
+        self._version = 0
+        self._sent_version = 0
+        self._next_send = 0.0
+
+        # One (ts, blocks) entry per Slack message posted so far.
+        self._messages: List[Tuple[Optional[str], list]] = []
+
+    def _snapshot(self) -> Tuple[int, str, list, bool]:
+        return self._version, ''.join(self._parts), self._extra_blocks, self._complete
+
+    def _finalize(self, response: Optional[Dict[str, Any]]):
+        """Replace streamed text with the final answer and close the stream."""
+        if response is not None:
+            if response.get('text'):
+                self._parts = [response['text']]
+            self._extra_blocks = create_response_blocks({**response, 'text': ''})
+        self._complete = True
+        self._closed = True
+        self._version += 1
+
+    @staticmethod
+    def _render(text: str, extra_blocks: list, is_complete: bool) -> List[list]:
+        """Blocks for each message needed to show the text so far."""
+        chunks = split_for_slack(format_for_slack(text)) if text else []
+        rendered = [
+            create_text_blocks(chunk, is_first=(i == 0), is_complete=is_complete or i < len(chunks) - 1)
+            for i, chunk in enumerate(chunks)
+        ]
+
+        if extra_blocks:
+            if rendered:
+                rendered[-1] = rendered[-1] + extra_blocks
+            else:
+                rendered.append(list(extra_blocks))
+
+        return rendered
+
+    def _plan(self, rendered: List[list]) -> List[Tuple[str, int, list]]:
+        """Slack calls (post, update or delete) that bring messages up to date."""
+        calls = []
+        for i, blocks in enumerate(rendered):
+            if i >= len(self._messages):
+                calls.append(('post', i, blocks))
+            elif self._messages[i][1] != blocks and self._messages[i][0]:
+                calls.append(('update', i, blocks))
+        for i in range(len(rendered), len(self._messages)):
+            if self._messages[i][0]:
+                calls.append(('delete', i, []))
+        return calls
+
+    def _record(self, action: str, index: int, blocks: list, ts: Optional[str]):
+        if action == 'post':
+            self._messages.append((ts, blocks))
+        elif action == 'update':
+            self._messages[index] = (self._messages[index][0], blocks)
+        else:
+            self._messages[index] = (None, blocks)
+
+
+class ResponseStreamer(_ResponseRenderer):
+    """
+    Streams agent answer text into Slack messages with throttled updates.
+
+    Usage:
+        streamer = ResponseStreamer(client, channel, min_interval=1.0)
+        agent.chat(query, callbacks=AgentCallbacks(on_text_delta=streamer.append))
+        streamer.finish(response)
+    """
+
+    def __init__(self, client, channel: str, min_interval: float = 1.0):
+        super().__init__(client, channel, min_interval)
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"slack-stream-{channel}")
+        self._thread.start()
+
+    def append(self, delta: str):
+        """Add streamed text; never blocks on the Slack API."""
+        with self._cond:
+            if self._closed:
+                return
+            self._parts.append(delta)
+            self._version += 1
+            self._cond.notify()
+
+    def finish(self, response: Optional[Dict[str, Any]] = None, timeout: float = 10):
+        """Render the final answer (if given), flush it, and stop the worker."""
+        with self._cond:
+            if not self._closed:
+                self._finalize(response)
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._version == self._sent_version and not self._closed:
+                    self._cond.wait()
+                if self._version == self._sent_version:
+                    return
+
+                delay = self._next_send - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                version, text, extra_blocks, is_complete = self._snapshot()
+
+            retry_after = self._sync(self._render(text, extra_blocks, is_complete))
+            if retry_after is None:
+                self._sent_version = version
+                self._next_send = time.monotonic() + self.min_interval
+            else:
+                self._next_send = time.monotonic() + retry_after
+
+    def _sync(self, rendered: List[list]) -> Optional[float]:
+        """Apply pending Slack calls; returns a Retry-After delay if rate limited."""
+        for action, index, blocks in self._plan(rendered):
+            ts = None
+            try:
+                if action == 'post':
+                    ts = self.client.chat_postMessage(channel=self.channel, text="Response", blocks=blocks)['ts']
+                elif action == 'update':
+                    self.client.chat_update(channel=self.channel, ts=self._messages[index][0], text="Response", blocks=blocks)
+                else:
+                    self.client.chat_delete(channel=self.channel, ts=self._messages[index][0])
+            except Exception as e:
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    return retry_after
+                print(f"Response update failed: {e}")
+            self._record(action, index, blocks, ts)
+        return None
+
+
+class AsyncResponseStreamer(_ResponseRenderer):
+    """
+    asyncio counterpart of ResponseStreamer for AsyncWebClient.
+
+    Usage:
+        streamer = AsyncResponseStreamer(client, channel, min_interval=1.0)
+        await agent.chat(query, callbacks=AgentCallbacks(on_text_delta=streamer.append))
+        await streamer.finish(response)
+    """
+
+    def __init__(self, client, channel: str, min_interval: float = 1.0):
+        super().__init__(client, channel, min_interval)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def append(self, delta: str):
+        """Add streamed text; never awaits the Slack API."""
+        if self._closed:
+            return
+        self._parts.append(delta)
+        self._version += 1
+        self._wakeup.set()
+
+    async def finish(self, response: Optional[Dict[str, Any]] = None, timeout: float = 10):
+        """Render the final answer (if given), flush it, and stop the worker."""
+        if not self._closed:
+            self._finalize(response)
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            while self._version == self._sent_version and not self._closed:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            if self._version == self._sent_version:
+                return
+
+            delay = self._next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            version, text, extra_blocks, is_complete = self._snapshot()
+            retry_after = await self._sync(self._render(text, extra_blocks, is_complete))
+            if retry_after is None:
+                self._sent_version = version
+                self._next_send = loop.time() + self.min_interval
+            else:
+                self._next_send = loop.time() + retry_after
+
+    async def _sync(self, rendered: List[list]) -> Optional[float]:
+        """Apply pending Slack calls; returns a Retry-After delay if rate limited."""
+        for action, index, blocks in self._plan(rendered):
+            ts = None
+            try:
+                if action == 'post':
+                    ts = (await self.client.chat_postMessage(channel=self.channel, text="Response", blocks=blocks))['ts']
+                elif action == 'update':
+                    await self.client.chat_update(channel=self.channel, ts=self._messages[index][0], text="Response", blocks=blocks)
+                else:
+                    await self.client.chat_delete(channel=self.channel, ts=self._messages[index][0])
+            except Exception as e:
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    return retry_after
+                print(f"Response update failed: {e}")
+            self._record(action, index, blocks, ts)
+        return None
@@ -0,0 +1,276 @@
+"""
+Snowflake connection helpers and a bounded, thread-safe connection pool.
+"""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import snowflake.connector
+
+from config import (
+    ACCOUNT, USER, PAT, WAREHOUSE, ROLE,
+    SNOWFLAKE_POOL_SIZE, SNOWFLAKE_CHECKOUT_TIMEOUT, SNOWFLAKE_IDLE_TIMEOUT
+)
+
+# Errors meaning the session or PAT-derived token is gone and a fresh login is needed.
+SESSION_EXPIRED_ERRNOS = {390111, 390112, 390114}
+
+
+def connect_snowflake():
+    """Open a new Snowflake connection using PAT authentication (raises on failure)."""
+    if not ACCOUNT:
+        raise ValueError("No account identifier found - set ACCOUNT env var")
+
+    return snowflake.connector.connect(
+        user=USER,
+        password=PAT,
+        account=ACCOUNT,
+        warehouse=WAREHOUSE,
+        role=ROLE
+    )
+
+
+def get_snowflake_connection():
+    """Create Snowflake connection using PAT authentication."""
+    try:
+        conn = connect_snowflake()
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT CURRENT_VERSION()")
+        row = cursor.fetchone()
+        version = row[0] if row else "unknown"
+        cursor.close()
+
+        print(f"Connected to Snowflake v{version}")
+        return conn
+
+    except Exception as e:
+        print(f"Snowflake connection failed: {e}")
+        return None
+
+
+def is_session_expired(error: Exception) -> bool:
+    """True if the error means the Snowflake session must be re-authenticated."""
+    return getattr(error, 'errno', None) in SESSION_EXPIRED_ERRNOS
+
+
+class SnowflakeConnectionPool:
+    """
+    Bounded pool of Snowflake connections shared by Slack handler threads.
+
+    Connections are opened lazily up to max_size, health-checked when they
+    have been idle for a while, closed after idle_timeout, and replaced when
+    the session expires.
+
+    Usage:
+        pool = SnowflakeConnectionPool(connect_snowflake, max_size=4)
+        df = pool.run(lambda conn: fetch(conn, "SELECT 1"))
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 4,
+        checkout_timeout: float = 30,
+        idle_timeout: float = 600,
+        health_check_interval: float = 60
+    ):
+        self._connect = connect
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Check out a healthy connection, waiting up to timeout seconds for one."""
+        deadline = time.monotonic() + (self.checkout_timeout if timeout is None else timeout)
+
+        while True:
+            conn, last_used, expired = self._reserve(deadline)
+            self._close_all(expired)
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._discard(None)
+                    raise
+
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                return conn
+
+            self._discard(conn)
+
+    def release(self, conn, broken: bool = False):
+        """Return a connection to the pool, closing it if broken."""
+        if broken or self._closed or self._is_closed(conn):
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Context manager that checks a connection out and returns it."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except Exception as e:
+            self.release(conn, broken=is_session_expired(e))
+            raise
+        else:
+            self.release(conn)
+
+    def run(self, fn: Callable[[Any], Any], retries: int = 1):
+        """Call fn(connection), re-authenticating and retrying if the session expired."""
+        attempt = 0
+        while True:
+            try:
+                with self.connection() as conn:
+                    return fn(conn)
+            except Exception as e:
+                if attempt < retries and is_session_expired(e):
+                    attempt += 1
+                    continue
+                raise
+
+    def warm_up(self, count: int = 1) -> int:
+        """Open up to count connections ahead of demand; returns how many are idle."""
+        opened = []
+        try:
+            for _ in range(min(count, self.max_size)):
+                opened.append(self.acquire())
+        except Exception as e:
+            print(f"Snowflake pool warm-up failed: {e}")
+        finally:
+            for conn in opened:
+                self.release(conn)
+        return len(opened)
+
+    def stats(self) -> Dict[str, int]:
+        """Current pool occupancy."""
+        with self._cond:
+            return {'size': self._size, 'idle': len(self._idle), 'max_size': self.max_size}
+
+    def close(self):
+        """Close idle connections; checked-out ones close when released."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def _reserve(self, deadline: float) -> Tuple[Any, float, list]:
+        """
+        Take an idle connection or a slot for a new one (conn None).
+
+        Also returns idle-expired connections for the caller to close outside
+        the lock.
+        """
+        expired = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    error = RuntimeError("Snowflake connection pool is closed")
+                    break
+
+                expired.extend(self._evict_idle_locked())
+
+                if self._idle:
+                    # Most recently used first keeps a warm working set.
+                    conn, last_used = self._idle.pop()
+                    return conn, last_used, expired
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, 0.0, expired
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    error = TimeoutError("No Snowflake connection available before checkout timeout")
+                    break
+                self._cond.wait(remaining)
+
+        self._close_all(expired)
+        raise error
+
+    def _evict_idle_locked(self) -> list:
+        """Drop connections idle longer than idle_timeout (caller holds the lock)."""
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = []
+        # Oldest connections sit at the left of the deque.
+        while self._idle and self._idle[0][1] < cutoff:
+            expired.append(self._idle.popleft()[0])
+        self._size -= len(expired)
+        return expired
+
+    def _discard(self, conn):
+        """Forget a connection (or a failed reservation) and free its slot."""
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        if conn is not None:
+            self._close_quietly(conn)
+
+    def _is_healthy(self, conn) -> bool:
+        """Round-trip a trivial query to confirm the session is usable."""
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _is_closed(conn) -> bool:
+        try:
+            return conn.is_closed()
+        except Exception:
+            return False
+
+    @classmethod
+    def _close_all(cls, conns: list):
+        for conn in conns:
+            cls._close_quietly(conn)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def create_snowflake_pool() -> Optional[SnowflakeConnectionPool]:
+    """Create the shared connection pool and verify credentials with one connection."""
+    pool = SnowflakeConnectionPool(
+        connect_snowflake,
+        max_size=SNOWFLAKE_POOL_SIZE,
+        checkout_timeout=SNOWFLAKE_CHECKOUT_TIMEOUT,
+        idle_timeout=SNOWFLAKE_IDLE_TIMEOUT
+    )
+
+    if not pool.warm_up(1):
+        pool.close()
+        return None
+
+    print(f"Snowflake connection pool ready (max {pool.max_size} connections)")
+    return pool
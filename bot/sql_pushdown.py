@@ -0,0 +1,93 @@
+"""
+SQL Pushdown
+Rewrites agent-generated SQL so Snowflake, not the bot, trims results that
+are too large to chart: a LIMIT just above the fetch cap, and a server-side
+top-N + "Other" aggregate for categorical results that hit it.
+"""
+
+import re
+
+# A statement that already ends in a row limit is left alone. Each clause is
+# spelled out token by token so a FETCH inside a subquery or CTE, followed by
+# more SQL, is not mistaken for the statement's own limit.
+_OFFSET = r'OFFSET\s+\d+(\s+ROWS?)?'
+_FETCH = r'FETCH(\s+(FIRST|NEXT))?\s+\d+(\s+ROWS?)?(\s+ONLY)?'
+_TRAILING_LIMIT = re.compile(
+    rf'\b(LIMIT\s+\d+(\s+OFFSET\s+\d+)?|({_OFFSET}\s+)?{_FETCH}|{_OFFSET})\s*$',
+    re.IGNORECASE
+)
+_SELECT_TOP = re.compile(r'^\s*SELECT\s+(DISTINCT\s+)?TOP\s+\d+', re.IGNORECASE)
+_QUERY_START = re.compile(r'^\s*\(*\s*(SELECT|WITH)\b', re.IGNORECASE)
+_TRAILING_BLOCK_COMMENT = re.compile(r'/\*((?!\*/).)*\*/\s*$', re.DOTALL)
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a result column name exactly as returned by Snowflake."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _line_comment_start(line: str) -> int:
+    """Index of a -- comment outside string literals and quoted names, or -1."""
+    quote = None
+    for i, char in enumerate(line):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif line.startswith('--', i):
+            return i
+    return -1
+
+
+def _strip_sql_tail(sql: str) -> str:
+    """Remove trailing whitespace, semicolons and comments from a statement."""
+    while True:
+        stripped = sql.rstrip().rstrip(';').rstrip()
+        head, _, last_line = stripped.rpartition('\n')
+        comment = _line_comment_start(last_line)
+        if comment >= 0:
+            stripped = head + ('\n' if head else '') + last_line[:comment]
+        elif _TRAILING_BLOCK_COMMENT.search(stripped):
+            stripped = _TRAILING_BLOCK_COMMENT.sub('', stripped)
+        if stripped == sql:
+            return sql
+        sql = stripped
+
+
+def limit_sql(sql: str, limit: int) -> str:
+    """
+    Append LIMIT to a SELECT/WITH query that has no row limit of its own.
+
+    Appending (rather than wrapping in a subquery) keeps any ORDER BY in
+    effect. Other statements (SHOW, DESCRIBE, ...) are returned unchanged.
+    """
+    sql = _strip_sql_tail(sql.strip())
+    if not _QUERY_START.match(sql) or _SELECT_TOP.match(sql) or _TRAILING_LIMIT.search(sql):
+        return sql
+    return f"{sql}\nLIMIT {int(limit)}"
+
+
+def top_n_sql(sql: str, label_col: str, value_col: str, n: int) -> str:
+    """
+    Aggregate a query's result to the n-1 largest labels by total value plus
+    an 'Other' row for the rest.
+    """
+    label = quote_identifier(label_col)
+    value = quote_identifier(value_col)
+    sql = _strip_sql_tail(sql.strip())
+    return f"""SELECT
+    IFF(label_rank < {int(n)}, TO_VARCHAR({label}), 'Other') AS {label},
+    SUM(label_total) AS {value}
+FROM (
+    SELECT
+        {label},
+        SUM({value}) AS label_total,
+        ROW_NUMBER() OVER (ORDER BY SUM({value}) DESC NULLS LAST) AS label_rank
+    FROM (
+{sql}
+    )
+    GROUP BY {label}
+)
+GROUP BY 1
+ORDER BY MIN(label_rank)"""
@@ -0,0 +1,144 @@
+"""
+Server-Sent Events Parser
+Incremental parser for text/event-stream bodies. Accepts raw byte chunks as
+they arrive from the network and returns complete events, following the
+WHATWG event-stream interpretation rules (multi-line data, id, retry,
+comments, CR/LF/CRLF line endings).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(slots=True)
+class SSEEvent:
+    """A dispatched Server-Sent Event."""
+    event: str = "message"
+    data: str = ""
+    id: Optional[str] = None
+    retry: Optional[int] = None
+
+
+class SSEParser:
+    """
+    Incremental Server-Sent Events parser.
+
+    Usage:
+        parser = SSEParser()
+        for chunk in http_response.iter_content(chunk_size=None):
+            for event in parser.feed(chunk):
+                handle(event.event, event.data)
+    """
+
+    def __init__(self):
+        self.last_event_id: Optional[str] = None
+        self._pending: List[bytes] = []
+        self._first_chunk = True
+        # Streams reuse a handful of event names; decode each one once.
+        self._event_names: Dict[bytes, str] = {}
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        """Consume a chunk of the stream and return every event it completes."""
+        if self._first_chunk and chunk:
+            self._first_chunk = False
+            if chunk.startswith(b"\xef\xbb\xbf"):
+                chunk = chunk[3:]
+
+        # Chunks without a line break cannot complete an event; collect them
+        # and join once so long data lines are not copied on every chunk.
+        if b"\n" not in chunk and b"\r" not in chunk:
+            if chunk:
+                self._pending.append(chunk)
+            return []
+
+        if self._pending:
+            self._pending.append(chunk)
+            buffer = b"".join(self._pending)
+        else:
+            buffer = chunk
+
+        # A trailing CR may be the first half of a CRLF split across chunks.
+        if buffer.endswith(b"\r"):
+            buffer = buffer[:-1]
+            keep_cr = True
+        else:
+            keep_cr = False
+
+        if b"\r" in buffer:
+            buffer = buffer.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        # Only complete events (terminated by a blank line) are parsed; the
+        # remainder waits in the buffer for the next chunk.
+        blocks = buffer.split(b"\n\n")
+        tail = blocks.pop()
+        if keep_cr:
+            tail += b"\r"
+        self._pending = [tail] if tail else []
+
+        events = []
+        for block in blocks:
+            # Fast path for the common "event: X\ndata: {...}" shape.
+            if block.startswith(b"event: "):
+                newline = block.find(b"\n")
+                if (
+                    newline > 0
+                    and block.startswith(b"data: ", newline + 1)
+                    and block.find(b"\n", newline + 1) < 0
+                ):
+                    if len(block) == newline + 7:
+                        # An empty data field carries nothing to dispatch.
+                        continue
+                    raw_name = block[7:newline]
+                    name = self._event_names.get(raw_name)
+                    if name is None:
+                        name = raw_name.decode("utf-8", errors="replace") or "message"
+                        self._event_names[raw_name] = name
+                    events.append(SSEEvent(
+                        name,
+                        block[newline + 7:].decode("utf-8", errors="replace"),
+                        self.last_event_id
+                    ))
+                    continue
+
+            event = self._parse_block(block)
+            if event is not None:
+                events.append(event)
+
+        return events
+
+    def _parse_block(self, block: bytes) -> Optional[SSEEvent]:
+        """Parse the lines of one complete event with the general field rules."""
+        event_type = ""
+        data: List[bytes] = []
+        retry: Optional[int] = None
+
+        for line in block.split(b"\n"):
+            if not line or line[0] == 0x3A:  # ':' starts a comment
+                continue
+
+            name, sep, value = line.partition(b":")
+            if sep and value[:1] == b" ":
+                value = value[1:]
+
+            if name == b"data":
+                data.append(value)
+            elif name == b"event":
+                event_type = value.decode("utf-8", errors="replace")
+            elif name == b"id":
+                if b"\0" not in value:
+                    self.last_event_id = value.decode("utf-8", errors="replace")
+            elif name == b"retry":
+                if value.isdigit():
+                    retry = int(value)
+
+        # No data, or only empty data fields: nothing is dispatched.
+        payload = b"\n".join(data)
+        if not payload:
+            return None
+
+        return SSEEvent(
+            event_type or "message",
+            payload.decode("utf-8", errors="replace"),
+            self.last_event_id,
+            retry
+        )
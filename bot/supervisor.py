@@ -0,0 +1,127 @@
+"""
+Multi-process Supervisor
+Runs BOT_WORKERS copies of app.py, each with its own Socket Mode connection
+(Slack spreads events across them) and its own Snowflake pool, so chart
+rendering and JSON parsing use more than one core. Conversation history is
+shared through the SQLite backend.
+
+On SIGTERM or SIGINT every worker is asked to drain: it disconnects from
+Slack, finishes in-flight answers, uploads pending charts and closes its
+pools, then exits. Workers still running CLEANUP_GRACE seconds after
+DRAIN_TIMEOUT are killed. Workers that crash are restarted with backoff.
+"""
+
+import os
+import sys
+import time
+import signal
+import subprocess
+from typing import Dict, List, Optional
+
+from config import BOT_WORKERS, DRAIN_TIMEOUT, CONVERSATION_BACKEND
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+MAX_RESTART_DELAY = 60
+# Workers spend up to DRAIN_TIMEOUT on in-flight answers, then still have to
+# finish chart uploads and close their pools before exiting.
+CLEANUP_GRACE = 15
+
+
+class Supervisor:
+    """
+    Starts, restarts and drains bot worker processes.
+
+    Usage:
+        Supervisor(workers=4).run()
+    """
+
+    def __init__(self, workers: int = 2, drain_timeout: float = 60, cleanup_grace: float = CLEANUP_GRACE):
+        self.workers = workers
+        self.drain_timeout = drain_timeout
+        self.cleanup_grace = cleanup_grace
+
+        self._procs: Dict[int, Optional[subprocess.Popen]] = {i: None for i in range(workers)}
+        self._started_at: Dict[int, float] = {}
+        self._failures: Dict[int, int] = {i: 0 for i in range(workers)}
+        self._restart_at: Dict[int, float] = {i: 0.0 for i in range(workers)}
+        self._stopping = False
+
+    def run(self) -> int:
+        """Supervise workers until a shutdown signal; returns an exit code."""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        print(f"Starting {self.workers} bot workers...")
+        while not self._stopping:
+            for worker_id in range(self.workers):
+                self._check(worker_id)
+            time.sleep(0.5)
+
+        return self._drain()
+
+    def _worker_env(self, worker_id: int) -> Dict[str, str]:
+        env = dict(os.environ)
+        env["BOT_WORKER_ID"] = str(worker_id)
+        env["PYTHONUNBUFFERED"] = "1"
+        # Threads may hop between workers, so history must be shared.
+        env["CONVERSATION_BACKEND"] = "sqlite"
+        return env
+
+    def _start(self, worker_id: int):
+        proc = subprocess.Popen([sys.executable, APP_PATH], env=self._worker_env(worker_id))
+        self._procs[worker_id] = proc
+        self._started_at[worker_id] = time.monotonic()
+        print(f"Worker {worker_id} started (pid {proc.pid})")
+
+    def _check(self, worker_id: int):
+        """Start a missing worker or schedule the restart of one that exited."""
+        proc = self._procs[worker_id]
+        now = time.monotonic()
+
+        if proc is None:
+            if now >= self._restart_at[worker_id]:
+                self._start(worker_id)
+            return
+
+        code = proc.poll()
+        if code is None:
+            return
+
+        # A worker that ran for a while before dying starts over at a short delay.
+        if now - self._started_at[worker_id] > MAX_RESTART_DELAY:
+            self._failures[worker_id] = 0
+        self._failures[worker_id] += 1
+        delay = min(2 ** self._failures[worker_id], MAX_RESTART_DELAY)
+
+        print(f"Worker {worker_id} exited with code {code}; restarting in {delay}s")
+        self._procs[worker_id] = None
+        self._restart_at[worker_id] = now + delay
+
+    def _request_stop(self, signum, frame):
+        if not self._stopping:
+            print(f"Received {signal.Signals(signum).name}, draining workers...")
+        self._stopping = True
+
+    def _drain(self) -> int:
+        """Ask workers to finish in-flight work, then kill any stragglers."""
+        running: List[subprocess.Popen] = [p for p in self._procs.values() if p and p.poll() is None]
+        for proc in running:
+            proc.send_signal(signal.SIGTERM)
+
+        deadline = time.monotonic() + self.drain_timeout + self.cleanup_grace
+        for proc in running:
+            try:
+                proc.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                print(f"Worker pid {proc.pid} did not drain in time; killing")
+                proc.kill()
+                proc.wait()
+
+        print("All workers stopped")
+        return 0
+
+
+if __name__ == "__main__":
+    if CONVERSATION_BACKEND != "sqlite":
+        print("Using the SQLite conversation backend so workers share thread history")
+    sys.exit(Supervisor(workers=BOT_WORKERS, drain_timeout=DRAIN_TIMEOUT).run())